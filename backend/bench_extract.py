@@ -0,0 +1,107 @@
+"""Benchmark de extracción sobre un corpus local de syllabus en PDF.
+
+Uso (desde `backend/`):
+
+    python bench_extract.py /ruta/a/corpus [--repeat 3] [--backends pypdf,pdfium,mupdf] [--with-cache]
+
+1. Compara la extracción de criterios de evaluación por tablas con el fast-path
+   (región recortada bajo el encabezado de evaluación) contra el escaneo completo
+   de todas las páginas, y verifica que ambos devuelvan los mismos ítems.
+2. Mide cada backend de texto instalado y verifica paridad con pypdf en lo que
+   importa aguas abajo: horarios, temario enumerado, criterios de evaluación y contacto.
+
+La caché de páginas se desactiva salvo con `--with-cache`: con `--repeat` mayor que 1
+las repeticiones medirían aciertos de caché y no la extracción.
+"""
+import argparse
+import pathlib
+import statistics
+import sys
+import time
+
+import main
+
+
+def _time_call(fn, repeat: int):
+    timings = []
+    result = None
+    for _ in range(repeat):
+        t0 = time.perf_counter()
+        result = fn()
+        timings.append(time.perf_counter() - t0)
+    return result, statistics.median(timings)
+
+
+def bench_tables(files: list[pathlib.Path], repeat: int) -> int:
+    mismatches = 0
+    total_fast = total_full = 0.0
+    print(f"{'file':40} {'full (ms)':>10} {'fast (ms)':>10} {'items':>6}  parity")
+    for path in files:
+        raw = path.read_bytes()
+        full_items, full_t = _time_call(lambda: main.extract_evaluation_items_from_pdf(raw, fast_path=False), repeat)
+        fast_items, fast_t = _time_call(lambda: main.extract_evaluation_items_from_pdf(raw), repeat)
+        same = fast_items == full_items
+        mismatches += 0 if same else 1
+        total_fast += fast_t
+        total_full += full_t
+        print(f"{path.name[:40]:40} {full_t * 1000:10.1f} {fast_t * 1000:10.1f} {len(fast_items):6d}  {'ok' if same else 'DIFF'}")
+    n = len(files)
+    print(f"\nper syllabus: full {total_full / n * 1000:.1f} ms, fast {total_fast / n * 1000:.1f} ms")
+    if mismatches:
+        print(f"{mismatches} file(s) with different extracted items")
+    return mismatches
+
+
+def _downstream(text: str) -> dict:
+    """Extractor outputs that should not depend on the text backend."""
+    return {
+        "schedule": main.extract_schedule(text),
+        "syllabus": main.extract_enumerated_syllabus(text),
+        "evaluation": main.extract_evaluation_items(text),
+        "contact": main.extract_contact(text),
+    }
+
+
+def bench_backends(files: list[pathlib.Path], repeat: int, names: list[str]) -> int:
+    available = [n for n in names if n == "pypdf" or main._backend_available(n)]
+    skipped = sorted(set(names) - set(available))
+    if skipped:
+        print(f"\nskipping backends not installed: {', '.join(skipped)}")
+    reference = {}
+    totals = {n: 0.0 for n in available}
+    diffs = {n: [] for n in available}
+    for path in files:
+        raw = path.read_bytes()
+        for name in available:
+            backend = main.TEXT_BACKENDS[name]()
+            texts, elapsed = _time_call(lambda: backend.page_texts(raw), repeat)
+            totals[name] += elapsed
+            out = _downstream("\n".join(texts))
+            if name == available[0]:
+                reference[path] = out
+            else:
+                diffs[name].extend(f"{path.name}:{k}" for k, v in out.items() if v != reference[path][k])
+    n = len(files)
+    print(f"\n{'backend':10} {'ms/syllabus':>12}  parity vs {available[0]}")
+    for name in available:
+        status = "reference" if name == available[0] else ("ok" if not diffs[name] else f"DIFF {', '.join(diffs[name][:5])}")
+        print(f"{name:10} {totals[name] / n * 1000:12.1f}  {status}")
+    return sum(len(d) for d in diffs.values())
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("corpus", type=pathlib.Path)
+    parser.add_argument("--repeat", type=int, default=3)
+    parser.add_argument("--backends", default="pypdf,pdfium,mupdf", help="comma separated, first one is the reference")
+    parser.add_argument("--with-cache", action="store_true", help="keep the page cache on (measures cache hits)")
+    args = parser.parse_args()
+    if not args.with_cache:
+        main.PAGE_CACHE.max_entries = 0
+    files = sorted(args.corpus.glob("*.pdf"))
+    if not files:
+        print(f"No PDF files found in {args.corpus}")
+        sys.exit(1)
+    failures = bench_tables(files, args.repeat)
+    failures += bench_backends(files, args.repeat, [b.strip() for b in args.backends.split(",") if b.strip()])
+    sys.exit(1 if failures else 0)
@@ -0,0 +1,94 @@
+"""Benchmark de arranque y memoria por worker.
+
+Uso (desde `backend/`, Linux):
+
+    python bench_startup.py [--workers 4]
+
+Para cada perfil (lazy / preload) mide en un proceso limpio el tiempo de
+`import main` (+ warm_up) y el RSS, luego hace fork de N workers que procesan
+un PDF pequeño y reporta RSS, PSS y memoria privada de cada worker.
+"""
+import argparse
+import json
+import os
+import subprocess
+import sys
+
+PROFILE_SCRIPT = r"""
+import json, os, sys, time
+t0 = time.perf_counter()
+if sys.argv[1] == "preload":
+    os.environ["SYLLABUS_PRELOAD"] = "1"
+import main
+startup = time.perf_counter() - t0
+
+def mem():
+    out = {}
+    try:
+        with open("/proc/self/smaps_rollup") as fh:
+            for line in fh:
+                parts = line.split()
+                if parts[0] in ("Rss:", "Pss:", "Private_Clean:", "Private_Dirty:"):
+                    out[parts[0][:-1]] = int(parts[1])
+    except OSError:
+        pass
+    return out
+
+def workload():
+    from reportlab.pdfgen import canvas
+    import io
+    buf = io.BytesIO()
+    c = canvas.Canvas(buf)
+    c.drawString(40, 700, "Evaluación: Examen 30% Lunes 10:00 - 11:30 examen 12 de mayo")
+    c.save()
+    raw = buf.getvalue()
+    text, _ = main.extract_pdf_text(raw, [], "bench.pdf")
+    main.extract_dates(text)
+    main.extract_schedule(text)
+    main.extract_evaluation_items_from_pdf(raw)
+
+master = mem()
+workers = []
+for _ in range(int(sys.argv[2])):
+    r, w = os.pipe()
+    pid = os.fork()
+    if pid == 0:
+        os.close(r)
+        workload()
+        os.write(w, json.dumps(mem()).encode())
+        os._exit(0)
+    os.close(w)
+    workers.append((pid, r))
+results = []
+for pid, r in workers:
+    with os.fdopen(r) as fh:
+        results.append(json.loads(fh.read() or "{}"))
+    os.waitpid(pid, 0)
+print(json.dumps({"startup_s": startup, "master": master, "workers": results}))
+"""
+
+
+def run_profile(profile: str, workers: int) -> dict:
+    here = os.path.dirname(os.path.abspath(__file__))
+    out = subprocess.run(
+        [sys.executable, "-c", PROFILE_SCRIPT, profile, str(workers)],
+        cwd=here, capture_output=True, text=True, check=True,
+    )
+    return json.loads(out.stdout.strip().splitlines()[-1])
+
+
+def main_cli() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--workers", type=int, default=4)
+    args = parser.parse_args()
+    for profile in ("lazy", "preload"):
+        res = run_profile(profile, args.workers)
+        master = res["master"]
+        print(f"[{profile}] startup {res['startup_s'] * 1000:.0f} ms, master RSS {master.get('Rss', 0) / 1024:.1f} MiB")
+        for idx, w in enumerate(res["workers"]):
+            private = (w.get("Private_Clean", 0) + w.get("Private_Dirty", 0)) / 1024
+            print(f"    worker {idx}: RSS {w.get('Rss', 0) / 1024:.1f} MiB, PSS {w.get('Pss', 0) / 1024:.1f} MiB, private {private:.1f} MiB")
+
+
+if __name__ == "__main__":
+    main_cli()
@@ -0,0 +1,25 @@
+"""Perfil de despliegue multi-worker.
+
+Uso (desde `backend/`):
+
+    gunicorn -c gunicorn.conf.py main:app
+
+El master importa la app con SYLLABUS_PRELOAD=1 (pdfplumber, pypdf, reportlab, ics,
+regex compiladas y métricas de fuentes) y luego hace fork de los workers, que comparten
+esas páginas copy-on-write.
+"""
+import multiprocessing
+import os
+
+os.environ.setdefault("SYLLABUS_PRELOAD", "1")
+
+bind = os.getenv("BIND", f"0.0.0.0:{os.getenv('PORT', '8000')}")
+workers = int(os.getenv("WEB_CONCURRENCY", max(2, multiprocessing.cpu_count())))
+# The app sizes its per-worker admission limit (and page pool) from WEB_CONCURRENCY
+os.environ.setdefault("WEB_CONCURRENCY", str(workers))
+worker_class = "uvicorn.workers.UvicornWorker"
+preload_app = True
+timeout = int(os.getenv("WORKER_TIMEOUT", "120"))
+# Recycle workers periodically so fragmentation from large PDFs does not accumulate
+max_requests = int(os.getenv("MAX_REQUESTS", "500"))
+max_requests_jitter = 50
@@ -0,0 +1,334 @@
+"""Prueba de carga local para /generar, /syllabus y /schedule.
+
+Uso (desde `backend/`, requiere `pip install httpx`):
+
+    python loadtest.py --rate 4 --duration 60 --mix syllabus=3,schedule=1,generar=2
+    python loadtest.py --corpus /ruta/a/pdfs --workers 4 --rate 8
+    python loadtest.py --url http://localhost:8000 --rate 2      # contra un servidor ya levantado
+    python loadtest.py --compare loadtest_results/A.json loadtest_results/B.json
+
+Levanta la app localmente (uvicorn, o gunicorn con --workers > 1), envía
+peticiones con llegadas de Poisson a la tasa pedida mezclando endpoints según
+--mix, y reporta throughput, percentiles de latencia, tasa de errores y
+CPU/RSS del servidor. Cada corrida se guarda en loadtest_results/ como JSON.
+
+Los PDFs salen de --corpus (los que tienen "horario"/"schedule" en el nombre
+se usan como horarios) o se generan sintéticamente. Por defecto el servidor
+arranca sin rate limiting por IP, sin cachés (artefactos y páginas) y sin
+índice de búsqueda, para medir el costo real de parseo.
+"""
+import argparse
+import asyncio
+import io
+import json
+import os
+import pathlib
+import random
+import socket
+import statistics
+import subprocess
+import sys
+import time
+
+HERE = pathlib.Path(__file__).resolve().parent
+RESULTS_DIR = HERE / "loadtest_results"
+
+
+# ------------------------------
+# Upload corpus
+# ------------------------------
+def synthetic_syllabus(course: str, filler_pages: int) -> bytes:
+    from reportlab.lib.pagesizes import letter
+    from reportlab.pdfgen import canvas
+    buf = io.BytesIO()
+    c = canvas.Canvas(buf, pagesize=letter)
+    lines = [
+        f"Curso: {course}",
+        "Profesor: Ana Torres Ruiz",
+        "contacto: ana.torres@universidad.edu",
+        "TEMARIO:",
+        *[f"{i}.{j} Tema {i}.{j} derivadas e integrales" for i in range(1, 4) for j in range(1, 4)],
+        "CRITERIOS DE EVALUACIÓN:",
+        "Examen parcial - 30%",
+        "Examen final - 40%",
+        "Tareas - 20%",
+        "Participación - 10%",
+        "Examen parcial: 12 de mayo",
+        "Entrega de proyecto: 3/06",
+        "BIBLIOGRAFÍA:",
+        "Stewart, Cálculo de una variable",
+    ]
+    for page in range(1 + filler_pages):
+        y = 740
+        for line in (lines if page == 0 else [f"Reglamento {page}.{k}: texto de relleno" for k in range(40)]):
+            c.drawString(50, y, line)
+            y -= 16
+        c.showPage()
+    c.save()
+    return buf.getvalue()
+
+
+def synthetic_schedule() -> bytes:
+    from reportlab.pdfgen import canvas
+    buf = io.BytesIO()
+    c = canvas.Canvas(buf)
+    for i, line in enumerate(["HORARIO", "Lunes y Miércoles 10:00 - 11:30", "Martes 14:00 - 15:30", "Jueves 8:00 - 9:30"]):
+        c.drawString(50, 740 - 18 * i, line)
+    c.save()
+    return buf.getvalue()
+
+
+def load_corpus(corpus: pathlib.Path | None) -> tuple[list[tuple[str, bytes]], list[tuple[str, bytes]]]:
+    """(syllabus files, schedule files) as (filename, bytes)."""
+    if corpus is not None:
+        syllabi, schedules = [], []
+        for path in sorted(corpus.glob("*.pdf")):
+            target = schedules if any(k in path.name.lower() for k in ("horario", "schedule")) else syllabi
+            target.append((path.name, path.read_bytes()))
+        if not syllabi and not schedules:
+            sys.exit(f"No PDF files found in {corpus}")
+        return syllabi or schedules, schedules or syllabi
+    syllabi = [(f"curso_{i}.pdf", synthetic_syllabus(f"Curso {i}", filler_pages=i)) for i in range(6)]
+    return syllabi, [("horario.pdf", synthetic_schedule())]
+
+
+def build_request(endpoint: str, syllabi, schedules, max_files: int) -> tuple[list, dict]:
+    """Random multipart upload for `endpoint`: (files, form data)."""
+    n = random.randint(1, max_files)
+    if endpoint == "schedule":
+        chosen = random.choices(schedules, k=n)
+    elif endpoint == "syllabus":
+        chosen = random.choices(syllabi, k=n)
+    else:
+        chosen = random.choices(syllabi, k=max(1, n - 1)) + random.choices(schedules, k=1)
+    files = [("files", (name, data, "application/pdf")) for name, data in chosen]
+    data = {"semester_start": "2026-02-02"} if endpoint in ("schedule", "generar") else {}
+    return files, data
+
+
+# ------------------------------
+# Server process and resource sampling
+# ------------------------------
+def _free_port() -> int:
+    with socket.socket() as s:
+        s.bind(("127.0.0.1", 0))
+        return s.getsockname()[1]
+
+
+def start_server(workers: int, env_overrides: dict) -> tuple[subprocess.Popen, str]:
+    port = _free_port()
+    env = {**os.environ, **env_overrides}
+    if workers > 1:
+        env["WEB_CONCURRENCY"] = str(workers)
+        cmd = [sys.executable, "-m", "gunicorn", "-c", "gunicorn.conf.py", "--bind", f"127.0.0.1:{port}", "main:app"]
+    else:
+        cmd = [sys.executable, "-m", "uvicorn", "main:app", "--host", "127.0.0.1", "--port", str(port), "--log-level", "warning"]
+    proc = subprocess.Popen(cmd, cwd=HERE, env=env, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+    return proc, f"http://127.0.0.1:{port}"
+
+
+async def wait_healthy(client, base_url: str, timeout: float = 60.0) -> None:
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        try:
+            if (await client.get(f"{base_url}/health")).status_code == 200:
+                return
+        except Exception:
+            pass
+        await asyncio.sleep(0.25)
+    raise RuntimeError("server did not become healthy")
+
+
+def _process_tree(pid: int) -> list[int]:
+    pids, stack = [], [pid]
+    while stack:
+        p = stack.pop()
+        pids.append(p)
+        for task in pathlib.Path(f"/proc/{p}/task").glob("*"):
+            try:
+                stack.extend(int(c) for c in (task / "children").read_text().split())
+            except OSError:
+                pass
+    return pids
+
+
+def _cpu_seconds_and_rss(pid: int) -> tuple[float, int]:
+    """Total CPU seconds and RSS (KiB) of a process and its children (Linux /proc)."""
+    ticks = os.sysconf("SC_CLK_TCK")
+    cpu, rss = 0.0, 0
+    for p in _process_tree(pid):
+        try:
+            fields = pathlib.Path(f"/proc/{p}/stat").read_text().rsplit(")", 1)[1].split()
+            cpu += (int(fields[11]) + int(fields[12])) / ticks
+            for line in pathlib.Path(f"/proc/{p}/status").read_text().splitlines():
+                if line.startswith("VmRSS:"):
+                    rss += int(line.split()[1])
+        except (OSError, IndexError, ValueError):
+            continue
+    return cpu, rss
+
+
+async def sample_resources(pid: int, samples: list, interval: float = 1.0) -> None:
+    prev_cpu, prev_t = _cpu_seconds_and_rss(pid)[0], time.monotonic()
+    while True:
+        await asyncio.sleep(interval)
+        cpu, rss = _cpu_seconds_and_rss(pid)
+        now = time.monotonic()
+        samples.append({"cpu_pct": 100 * (cpu - prev_cpu) / (now - prev_t), "rss_mib": rss / 1024})
+        prev_cpu, prev_t = cpu, now
+
+
+# ------------------------------
+# Load generation and report
+# ------------------------------
+async def one_request(client, base_url: str, endpoint: str, files, data, results: list) -> None:
+    t0 = time.perf_counter()
+    try:
+        r = await client.post(f"{base_url}/{endpoint}", files=files, data=data)
+        status = r.status_code
+    except Exception as e:
+        status = type(e).__name__
+    results.append({"endpoint": endpoint, "status": status, "latency": time.perf_counter() - t0, "sent_at": t0})
+
+
+def _percentile(values: list[float], pct: float) -> float:
+    if not values:
+        return 0.0
+    ordered = sorted(values)
+    k = max(0, min(len(ordered) - 1, round(pct / 100 * (len(ordered) - 1))))
+    return ordered[k]
+
+
+def summarize(results: list, samples: list, elapsed: float) -> dict:
+    report = {"elapsed_s": elapsed, "endpoints": {}}
+    groups = {"all": results}
+    for r in results:
+        groups.setdefault(r["endpoint"], []).append(r)
+    for name, rs in groups.items():
+        ok = [r["latency"] for r in rs if r["status"] == 200]
+        statuses: dict[str, int] = {}
+        for r in rs:
+            statuses[str(r["status"])] = statuses.get(str(r["status"]), 0) + 1
+        report["endpoints"][name] = {
+            "requests": len(rs),
+            "throughput_rps": len(ok) / elapsed if elapsed else 0.0,
+            "error_rate": 1 - len(ok) / len(rs) if rs else 0.0,
+            "statuses": statuses,
+            "p50_ms": _percentile(ok, 50) * 1000,
+            "p90_ms": _percentile(ok, 90) * 1000,
+            "p99_ms": _percentile(ok, 99) * 1000,
+            "max_ms": max(ok, default=0.0) * 1000,
+        }
+    if samples:
+        report["server"] = {
+            "cpu_pct_mean": statistics.mean(s["cpu_pct"] for s in samples),
+            "cpu_pct_max": max(s["cpu_pct"] for s in samples),
+            "rss_mib_max": max(s["rss_mib"] for s in samples),
+        }
+    return report
+
+
+def print_report(report: dict) -> None:
+    print(f"\n{'endpoint':10} {'reqs':>6} {'ok rps':>7} {'err %':>6} {'p50 ms':>8} {'p90 ms':>8} {'p99 ms':>8}  statuses")
+    for name, e in report["endpoints"].items():
+        print(f"{name:10} {e['requests']:6d} {e['throughput_rps']:7.2f} {e['error_rate'] * 100:6.1f} "
+              f"{e['p50_ms']:8.0f} {e['p90_ms']:8.0f} {e['p99_ms']:8.0f}  {e['statuses']}")
+    if "server" in report:
+        s = report["server"]
+        print(f"\nserver: CPU mean {s['cpu_pct_mean']:.0f}% (max {s['cpu_pct_max']:.0f}%), RSS max {s['rss_mib_max']:.0f} MiB")
+
+
+def compare(a_path: pathlib.Path, b_path: pathlib.Path) -> None:
+    a, b = json.loads(a_path.read_text()), json.loads(b_path.read_text())
+    print(f"{'endpoint':10} {'metric':15} {a_path.stem:>22} {b_path.stem:>22} {'delta':>8}")
+    for name in a["report"]["endpoints"]:
+        if name not in b["report"]["endpoints"]:
+            continue
+        for metric in ("throughput_rps", "error_rate", "p50_ms", "p90_ms", "p99_ms"):
+            va, vb = a["report"]["endpoints"][name][metric], b["report"]["endpoints"][name][metric]
+            delta = f"{(vb - va) / va * 100:+.0f}%" if va else "n/a"
+            print(f"{name:10} {metric:15} {va:22.2f} {vb:22.2f} {delta:>8}")
+
+
+async def run(args) -> dict:
+    import httpx
+    mix = {}
+    for part in args.mix.split(","):
+        name, _, weight = part.partition("=")
+        mix[name.strip()] = float(weight or 1)
+    syllabi, schedules = load_corpus(args.corpus)
+    proc = None
+    base_url = args.url
+    if base_url is None:
+        env = {}
+        if not args.keep_rate_limit:
+            env["SYLLABUS_RATE_PER_MIN"] = "0"
+        if not args.with_cache:
+            env["SYLLABUS_ARTIFACT_CACHE_ENTRIES"] = "0"
+            env["SYLLABUS_PAGE_CACHE_ENTRIES"] = "0"
+        # Measure parsing, not SQLite writes (and never leave a test index behind)
+        env["SYLLABUS_INDEX_PATH"] = "off"
+        proc, base_url = start_server(args.workers, env)
+    results: list = []
+    samples: list = []
+    sampler = None
+    try:
+        async with httpx.AsyncClient(timeout=args.timeout) as client:
+            await wait_healthy(client, base_url)
+            if proc is not None:
+                sampler = asyncio.create_task(sample_resources(proc.pid, samples))
+            print(f"target {base_url}: {args.rate} req/s for {args.duration}s, mix {mix}")
+            in_flight = set()
+            start = time.monotonic()
+            while time.monotonic() - start < args.duration:
+                endpoint = random.choices(list(mix), weights=list(mix.values()))[0]
+                files, data = build_request(endpoint, syllabi, schedules, args.max_files)
+                task = asyncio.create_task(one_request(client, base_url, endpoint, files, data, results))
+                in_flight.add(task)
+                task.add_done_callback(in_flight.discard)
+                # Open-loop Poisson arrivals: the send rate does not slow down when the server does
+                await asyncio.sleep(random.expovariate(args.rate))
+            if in_flight:
+                await asyncio.wait(in_flight)
+            elapsed = time.monotonic() - start
+    finally:
+        if sampler is not None:
+            sampler.cancel()
+        if proc is not None:
+            proc.terminate()
+            proc.wait(timeout=30)
+    return summarize(results, samples, elapsed)
+
+
+def main_cli() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--rate", type=float, default=2.0, help="target requests per second")
+    parser.add_argument("--duration", type=float, default=30.0, help="seconds of load")
+    parser.add_argument("--mix", default="syllabus=3,schedule=1,generar=2", help="endpoint weights")
+    parser.add_argument("--max-files", type=int, default=3, help="max files per upload")
+    parser.add_argument("--corpus", type=pathlib.Path, help="directory of recorded PDFs (default: synthetic)")
+    parser.add_argument("--workers", type=int, default=1, help="server workers (>1 uses gunicorn.conf.py)")
+    parser.add_argument("--url", help="target an already running server instead of starting one")
+    parser.add_argument("--timeout", type=float, default=120.0)
+    parser.add_argument("--keep-rate-limit", action="store_true", help="keep the per-IP rate limit on the local server")
+    parser.add_argument("--with-cache", action="store_true", help="keep the artifact and page caches on the local server")
+    parser.add_argument("--label", default="", help="name added to the results file")
+    parser.add_argument("--seed", type=int, default=None)
+    parser.add_argument("--compare", nargs=2, type=pathlib.Path, metavar=("A", "B"), help="compare two stored runs")
+    args = parser.parse_args()
+    if args.compare:
+        compare(*args.compare)
+        return
+    random.seed(args.seed)
+    report = asyncio.run(run(args))
+    print_report(report)
+    RESULTS_DIR.mkdir(exist_ok=True)
+    stamp = time.strftime("%Y%m%d-%H%M%S")
+    out = RESULTS_DIR / f"{stamp}{'-' + args.label if args.label else ''}.json"
+    config = {k: (str(v) if isinstance(v, pathlib.Path) else v) for k, v in vars(args).items() if k != "compare"}
+    out.write_text(json.dumps({"config": config, "report": report}, indent=2))
+    print(f"\nresults saved to {out.relative_to(HERE)}")
+
+
+if __name__ == "__main__":
+    main_cli()
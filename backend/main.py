@@ -1,14 +1,336 @@
+import asyncio
+import bisect
+import contextlib
+import functools
+import gc
+import hashlib
+import hmac
+import io
+import json
+import math
+import os
 import re
+import sqlite3
+import threading
+import time
+import traceback
 import uuid
-from ics import Calendar, Event
-from fastapi import FastAPI, UploadFile, File
-from typing import List
-import io
+import tempfile
+from collections import OrderedDict
+from concurrent.futures import ProcessPoolExecutor
+from datetime import date, datetime, timedelta
+from typing import Callable, List, NamedTuple
+
+from fastapi import APIRouter, Depends, FastAPI, HTTPException, Request, UploadFile, File, Response, Form
+from fastapi.middleware.cors import CORSMiddleware
+
+# Heavy PDF/calendar backends (pdfplumber, pypdf, reportlab, ics) are imported lazily inside the
+# functions that need them, so /health and cold workers do not pay for them. With preloading
+# (see create_app / gunicorn.conf.py) they are imported once in the master and shared copy-on-write.
 try:
-    import pdfplumber  # Optional, better table/positional extraction
-except ImportError:  # pragma: no cover
-    pdfplumber = None
-app = FastAPI()
+    from pdf_extract import (
+        TEXT_BACKENDS, EvalItem, _eval_rows_from_table, _eval_table_rows_worker, _load_pdfplumber,
+        _page_texts_worker, _strip_accents,
+    )
+except ImportError:  # imported as backend.main (uvicorn backend.main:app from the repo root)
+    from .pdf_extract import (
+        TEXT_BACKENDS, EvalItem, _eval_rows_from_table, _eval_table_rows_worker, _load_pdfplumber,
+        _page_texts_worker, _strip_accents,
+    )
+
+router = APIRouter()
+
+# ------------------------------
+# Admission control / rate limiting
+# ------------------------------
+def _env_float(name: str, default: float) -> float:
+    try:
+        return float(os.getenv(name, default))
+    except ValueError:
+        return default
+
+class AdmissionController:
+    """Bound the number of concurrent parse jobs in this worker.
+    Up to `max_active` jobs run at once, up to `max_queue` more wait for a slot (at most
+    `queue_timeout` seconds); anything beyond that is rejected with 503 + Retry-After.
+    """
+
+    def __init__(self, max_active: int, max_queue: int, queue_timeout: float, retry_after: int):
+        self.max_active = max(1, max_active)
+        self.max_queue = max(0, max_queue)
+        self.queue_timeout = queue_timeout
+        self.retry_after = retry_after
+        self._sem = asyncio.Semaphore(self.max_active)
+        self.active = 0
+        self.queued = 0
+        self.admitted_total = 0
+        self.rejected_queue_full = 0
+        self.rejected_timeout = 0
+
+    @classmethod
+    def from_env(cls) -> "AdmissionController":
+        """Size the controller to the CPU cores available to this worker.
+        SYLLABUS_JOBS_PER_CPU (default 1) concurrent parse jobs per core, split across
+        WEB_CONCURRENCY workers; SYLLABUS_PARSE_QUEUE waiting jobs (default 2x active).
+        """
+        cores = os.cpu_count() or 1
+        workers = max(1, int(_env_float("WEB_CONCURRENCY", 1)))
+        max_active = max(1, math.floor(_env_float("SYLLABUS_JOBS_PER_CPU", 1.0) * cores / workers))
+        max_queue = int(_env_float("SYLLABUS_PARSE_QUEUE", 2 * max_active))
+        return cls(
+            max_active=max_active,
+            max_queue=max_queue,
+            queue_timeout=_env_float("SYLLABUS_QUEUE_TIMEOUT", 30.0),
+            retry_after=int(_env_float("SYLLABUS_RETRY_AFTER", 5)),
+        )
+
+    def _reject(self, reason: str):
+        return HTTPException(
+            status_code=503,
+            detail=f"Server busy ({reason}), please retry later.",
+            headers={"Retry-After": str(self.retry_after)},
+        )
+
+    @contextlib.asynccontextmanager
+    async def slot(self):
+        if self.active + self.queued >= self.max_active + self.max_queue:
+            self.rejected_queue_full += 1
+            raise self._reject("queue full")
+        self.queued += 1
+        try:
+            await asyncio.wait_for(self._sem.acquire(), timeout=self.queue_timeout)
+        except asyncio.TimeoutError:
+            self.rejected_timeout += 1
+            raise self._reject("queue timeout")
+        finally:
+            self.queued -= 1
+        self.active += 1
+        self.admitted_total += 1
+        try:
+            yield
+        finally:
+            self.active -= 1
+            self._sem.release()
+
+    def snapshot(self) -> dict:
+        return {
+            "max_active": self.max_active,
+            "max_queue": self.max_queue,
+            "active": self.active,
+            "queue_depth": self.queued,
+            "admitted_total": self.admitted_total,
+            "rejected_queue_full": self.rejected_queue_full,
+            "rejected_timeout": self.rejected_timeout,
+        }
+
+class TokenBucketLimiter:
+    """Per-client token bucket: `rate` requests/second sustained, bursts up to `burst`.
+    Only the `max_clients` most recently seen clients are tracked.
+    """
+
+    def __init__(self, rate: float, burst: float, max_clients: int = 10000, trusted_proxy_hops: int = 0):
+        self.rate = rate
+        self.burst = max(1.0, burst)
+        self.max_clients = max_clients
+        self.trusted_proxy_hops = max(0, trusted_proxy_hops)
+        self._buckets: OrderedDict[str, tuple[float, float]] = OrderedDict()
+        self.rejected_total = 0
+
+    @classmethod
+    def from_env(cls) -> "TokenBucketLimiter":
+        """SYLLABUS_RATE_PER_MIN (default 30) sustained requests per client IP, SYLLABUS_RATE_BURST (default 10).
+        SYLLABUS_TRUSTED_PROXY_HOPS (default 0) is the number of reverse proxies in front of the app
+        (1 on Render) whose X-Forwarded-For entries identify the client.
+        """
+        return cls(
+            rate=_env_float("SYLLABUS_RATE_PER_MIN", 30.0) / 60.0,
+            burst=_env_float("SYLLABUS_RATE_BURST", 10.0),
+            trusted_proxy_hops=int(_env_float("SYLLABUS_TRUSTED_PROXY_HOPS", 0)),
+        )
+
+    def client_key(self, request: Request) -> str:
+        """Client IP to rate limit. Behind N trusted proxies the client is the N-th X-Forwarded-For
+        entry from the right (the one the outermost proxy appended); entries further left come
+        from the client itself and can be spoofed, so they are ignored."""
+        if self.trusted_proxy_hops:
+            forwarded = [part.strip() for part in request.headers.get("x-forwarded-for", "").split(",") if part.strip()]
+            if len(forwarded) >= self.trusted_proxy_hops:
+                return forwarded[-self.trusted_proxy_hops]
+        return request.client.host if request.client else "unknown"
+
+    def acquire(self, client: str, cost: float = 1.0) -> float:
+        """Take `cost` tokens for `client`. Returns 0 when allowed, else seconds to wait."""
+        if self.rate <= 0:
+            return 0.0
+        now = time.monotonic()
+        tokens, last = self._buckets.pop(client, (self.burst, now))
+        tokens = min(self.burst, tokens + (now - last) * self.rate)
+        wait = 0.0
+        if tokens >= cost:
+            tokens -= cost
+        else:
+            wait = (cost - tokens) / self.rate
+            self.rejected_total += 1
+        self._buckets[client] = (tokens, now)
+        if len(self._buckets) > self.max_clients:
+            self._buckets.popitem(last=False)
+        return wait
+
+    def snapshot(self) -> dict:
+        return {
+            "rate_per_min": self.rate * 60,
+            "burst": self.burst,
+            "trusted_proxy_hops": self.trusted_proxy_hops,
+            "tracked_clients": len(self._buckets),
+            "rejected_total": self.rejected_total,
+        }
+
+def rate_limit(request: Request):
+    """Dependency: per-IP token bucket, 429 + Retry-After when exhausted."""
+    limiter: TokenBucketLimiter = request.app.state.rate_limiter
+    wait = limiter.acquire(limiter.client_key(request))
+    if wait > 0:
+        raise HTTPException(
+            status_code=429,
+            detail="Too many requests, please retry later.",
+            headers={"Retry-After": str(math.ceil(wait))},
+        )
+
+@contextlib.asynccontextmanager
+async def parse_slot(request: Request):
+    """Per-IP rate limit, then a parse slot. Routes with an artifact cache enter it only on a miss."""
+    rate_limit(request)
+    async with request.app.state.admission.slot():
+        yield
+
+async def parse_admission(request: Request):
+    """Dependency for the CPU-heavy routes without an artifact cache: parse_slot for the whole request."""
+    async with parse_slot(request):
+        yield
+
+# ------------------------------
+# Memory guardrails
+# ------------------------------
+# A request's memory is the growth of this worker's RSS since the request started, sampled at
+# every extraction stage and after each page of table detection. With several requests in flight
+# the growth is shared between them, so the numbers are an upper bound for each one. Past the soft
+# limit the request degrades (no pdfplumber tables, only the first pages of the next files are
+# read); past the hard limit the current file is aborted and the remaining files are skipped.
+def _rss_bytes() -> int:
+    """Current resident set size of this process (0 where /proc is unavailable)."""
+    try:
+        with open("/proc/self/statm") as fh:
+            return int(fh.read().split()[1]) * os.sysconf("SC_PAGE_SIZE")
+    except (OSError, ValueError, IndexError):
+        return 0
+
+class MemoryLimitExceeded(Exception):
+    def __init__(self, stage: str, used: int, limit: int):
+        super().__init__(f"memory limit exceeded during {stage} ({used // 2**20} MB > {limit // 2**20} MB)")
+        self.stage = stage
+
+class MemoryBudget:
+    """Memory accounting of one request: peak growth overall and per stage, plus the soft/hard limits."""
+
+    def __init__(self, soft_bytes: int, hard_bytes: int, soft_max_pages: int):
+        self.soft_bytes = soft_bytes
+        self.hard_bytes = hard_bytes
+        self.soft_max_pages = soft_max_pages
+        self.baseline = _rss_bytes()
+        self.peak = 0
+        self.stage = "start"
+        self.stage_peaks: dict[str, int] = {}
+        self.degraded = False
+        self.aborted = False
+
+    def sample(self) -> int:
+        """Record the current growth against the running stage; returns it in bytes."""
+        used = max(0, _rss_bytes() - self.baseline)
+        self.peak = max(self.peak, used)
+        self.stage_peaks[self.stage] = max(self.stage_peaks.get(self.stage, 0), used)
+        return used
+
+    def check(self, stage: str | None = None) -> bool:
+        """Sample memory for the running stage, then enter `stage` if given. Returns True once the
+        soft limit was crossed; raises MemoryLimitExceeded past the hard limit."""
+        used = self.sample()
+        if self.hard_bytes > 0 and used > self.hard_bytes:
+            self.aborted = True
+            raise MemoryLimitExceeded(self.stage, used, self.hard_bytes)
+        if self.soft_bytes > 0 and used > self.soft_bytes and not self.degraded:
+            self.degraded = True
+            print(f"[WARN] Memory soft limit reached during {self.stage} ({used // 2**20} MB); degrading request")
+        if stage is not None:
+            self.stage = stage
+        return self.degraded
+
+    @property
+    def max_pages(self) -> int | None:
+        """Page cap for the files read from now on (None while under the soft limit)."""
+        return self.soft_max_pages if self.degraded else None
+
+    @property
+    def complete(self) -> bool:
+        """False once the request was degraded or aborted: its output is partial and must not be
+        cached under the input ETag nor indexed."""
+        return not (self.degraded or self.aborted)
+
+class MemoryStats:
+    """Per-worker aggregate of request memory budgets, exposed in /metrics."""
+
+    def __init__(self, soft_bytes: int, hard_bytes: int, soft_max_pages: int):
+        self.soft_bytes = soft_bytes
+        self.hard_bytes = hard_bytes
+        self.soft_max_pages = soft_max_pages
+        self.requests = 0
+        self.degraded = 0
+        self.aborted = 0
+        self.last_peak = 0
+        self.max_peak = 0
+        self.stage_max_peak: dict[str, int] = {}
+
+    @classmethod
+    def from_env(cls) -> "MemoryStats":
+        """SYLLABUS_MEM_SOFT_MB (default 512) and SYLLABUS_MEM_HARD_MB (default 1024) of RSS growth
+        per request, 0 disables either; SYLLABUS_MEM_SOFT_MAX_PAGES (default 40) pages per file when degraded."""
+        return cls(
+            soft_bytes=int(_env_float("SYLLABUS_MEM_SOFT_MB", 512) * 2**20),
+            hard_bytes=int(_env_float("SYLLABUS_MEM_HARD_MB", 1024) * 2**20),
+            soft_max_pages=int(_env_float("SYLLABUS_MEM_SOFT_MAX_PAGES", 40)),
+        )
+
+    @contextlib.contextmanager
+    def track(self):
+        budget = MemoryBudget(self.soft_bytes, self.hard_bytes, self.soft_max_pages)
+        try:
+            yield budget
+        finally:
+            budget.sample()
+            self.record(budget)
+
+    def record(self, budget: MemoryBudget) -> None:
+        self.requests += 1
+        self.degraded += budget.degraded
+        self.aborted += budget.aborted
+        self.last_peak = budget.peak
+        self.max_peak = max(self.max_peak, budget.peak)
+        for stage, peak in budget.stage_peaks.items():
+            self.stage_max_peak[stage] = max(self.stage_max_peak.get(stage, 0), peak)
+
+    def snapshot(self) -> dict:
+        mb = lambda n: round(n / 2**20, 1)
+        return {
+            "rss_mb": mb(_rss_bytes()),
+            "soft_limit_mb": mb(self.soft_bytes),
+            "hard_limit_mb": mb(self.hard_bytes),
+            "requests": self.requests,
+            "degraded": self.degraded,
+            "aborted": self.aborted,
+            "last_request_peak_mb": mb(self.last_peak),
+            "max_request_peak_mb": mb(self.max_peak),
+            "stage_max_peak_mb": {stage: mb(peak) for stage, peak in sorted(self.stage_max_peak.items())},
+        }
+
 DAY_NAMES = {
     # English
     'monday': 0, 'tuesday': 1, 'wednesday': 2, 'thursday': 3, 'friday': 4, 'saturday': 5, 'sunday': 6,
@@ -30,14 +352,19 @@ SCHEDULE_PATTERN = re.compile(
     rf"(?P<days>(?:\b(?:{DAY_TOKEN_INLINE})\b)(?:\s*(?:/|,|y|and|&)+\s*(?:\b(?:{DAY_TOKEN_INLINE})\b))*)\s*[:\-–—]?\s*(?P<start>{TIME_TOKEN})\s*(?:-|–|—|a|to)\s*(?P<end>{TIME_TOKEN})",
     re.IGNORECASE
 )
+TIME_RANGE_PATTERN = re.compile(rf"(?P<start>{TIME_TOKEN})\s*(?:-|–|—|a|to)\s*(?P<end>{TIME_TOKEN})", re.IGNORECASE)
+DAY_INLINE_RE = re.compile(rf"\b({DAY_TOKEN_INLINE})\b", re.IGNORECASE)
+DAY_ANY_RE = re.compile(rf"\b({DAY_TOKEN})\b", re.IGNORECASE)
+TIME_TOKEN_RE = re.compile(TIME_TOKEN)
 
-def _strip_accents(s: str) -> str:
-    return (
-        s.replace('á', 'a').replace('é', 'e').replace('í', 'i').replace('ó', 'o').replace('ú', 'u')
-         .replace('Á', 'a').replace('É', 'e').replace('Í', 'i').replace('Ó', 'o').replace('Ú', 'u')
-    )
+class Slot(NamedTuple):
+    """A weekly class slot; start/end are minutes since midnight."""
+    weekday: int
+    start: int
+    end: int
 
-def _parse_time_24(t: str) -> str:
+def _parse_time_minutes(t: str) -> int:
+    """Parse '13:00', '1pm', '1:30 p.m.' into minutes since midnight."""
     t = t.strip().lower()
     t = t.replace('a.m.', 'am').replace('p.m.', 'pm')
     ampm = None
@@ -59,32 +386,49 @@ def _parse_time_24(t: str) -> str:
         else:  # pm
             if h != 12:
                 h += 12
-    return f"{h:02d}:{m:02d}"
+    return h * 60 + m
+
+def _course_key(text: str) -> str:
+    """Normalized course label from the text around a slot (day names, times and punctuation removed).
+    An empty key means the course is unknown."""
+    low = TIME_RANGE_PATTERN.sub(" ", _strip_accents(text.lower()))
+    words = [w for w in re.findall(r"[a-z0-9]+", low) if w not in DAY_NAMES and not TIME_TOKEN_RE.fullmatch(w)]
+    return " ".join(words)
+
+def extract_schedule(text) -> list[Slot]:
+    """Extract class schedule as list of Slot(weekday, start, end). Supports multiple days, AM/PM and line-based formats."""
+    slots = list({slot for slot, _ in extract_schedule_courses(text)})
+    slots.sort(key=lambda x: (x.weekday, x.start))
+    return slots
 
-def extract_schedule(text):
-    """Extract class schedule as list of (weekday, HH:MM, HH:MM). Supports multiple days, AM/PM and line-based formats."""
+def extract_schedule_courses(text) -> list[tuple[Slot, str]]:
+    """Like extract_schedule, but pairs each slot with the course key of the line it came from."""
     slots = []
     # Pass 1: inline patterns with days + time in the same line
     for m in SCHEDULE_PATTERN.finditer(text):
+        line_start = text.rfind("\n", 0, m.start()) + 1
+        # TIME_TOKEN's trailing \s* can swallow the newline: search from the start of the end time
+        line_end = text.find("\n", m.start('end'))
+        line_end = len(text) if line_end == -1 else line_end
+        course = _course_key(text[line_start:m.start()] + " " + text[m.end():line_end])
         days_raw = m.group('days')
         start_raw = m.group('start')
         end_raw = m.group('end')
-        start = _parse_time_24(start_raw)
-        end = _parse_time_24(end_raw)
-        for day_token in re.findall(rf"\b({DAY_TOKEN_INLINE})\b", days_raw, flags=re.IGNORECASE):
+        start = _parse_time_minutes(start_raw)
+        end = _parse_time_minutes(end_raw)
+        for day_token in DAY_INLINE_RE.findall(days_raw):
             key = _strip_accents(day_token.lower())
             weekday = DAY_NAMES.get(key)
             if weekday is not None:
-                slots.append((weekday, start, end))
+                slots.append((Slot(weekday, start, end), course))
     # Pass 2: line-based patterns, e.g., "LU" on one line, next line "13:00-14:30 T-402"
     lines = text.splitlines()
     current_days = []
-    time_range = re.compile(rf"(?P<start>{TIME_TOKEN})\s*(?:-|–|—|a|to)\s*(?P<end>{TIME_TOKEN})", re.IGNORECASE)
-    day_line_re = re.compile(rf"\b(?:{DAY_TOKEN})(?:\b\s*(?:/|,|\||\s+))+\b|\b(?:{DAY_TOKEN})\b\s*$", re.IGNORECASE)
+    time_range = TIME_RANGE_PATTERN
     for line in lines:
         low = _strip_accents(line.lower())
         # Detect day-only lines or day groups
-        found_days = re.findall(rf"\b({DAY_TOKEN})\b", low, flags=re.IGNORECASE)
+        found_days = DAY_ANY_RE.findall(low)
         found_times = list(time_range.finditer(low))
         if found_days and not found_times:
             # Refresh current days context
@@ -106,18 +450,18 @@ def extract_schedule(text):
                         days_to_use.append(wd)
             # For each time range on the line, emit slots
             for tm in found_times:
-                start = _parse_time_24(tm.group('start'))
-                end = _parse_time_24(tm.group('end'))
+                start = _parse_time_minutes(tm.group('start'))
+                end = _parse_time_minutes(tm.group('end'))
                 if days_to_use:
                     for wd in days_to_use:
-                        slots.append((wd, start, end))
+                        slots.append((Slot(wd, start, end), _course_key(line)))
             # Reset current days after pairing with a time line
             if days_to_use:
                 current_days = []
     # Deduplicate slots
-    slots = list({(wd, start, end) for (wd, start, end) in slots})
+    slots = list(dict.fromkeys(slots))
     # Sort by weekday then start time
-    slots.sort(key=lambda x: (x[0], x[1]))
+    slots.sort(key=lambda x: (x[0].weekday, x[0].start))
     return slots
 
 def next_weekday(dt, weekday):
@@ -125,36 +469,107 @@ def next_weekday(dt, weekday):
     days_ahead = (weekday - dt.weekday() + 7) % 7
     return dt + timedelta(days=days_ahead)
 
-from datetime import timedelta
+class _MergedSlot:
+    __slots__ = ("start", "end", "sources", "courses")
+
+    def __init__(self, start: int, end: int, sources: set[tuple[str, str]], courses: set[str]):
+        self.start = start
+        self.end = end
+        self.sources = sources
+        self.courses = courses
+
+class SlotStore:
+    """Class slots merged per weekday across files and extraction passes.
+    Intervals are minutes since midnight. Two slots merge when they have the same interval
+    (whatever course key each source read), when they overlap and share a course key, or when
+    one interval contains the other and the course of either is unknown (empty key).
+    Overlapping slots of different courses stay separate events, and back-to-back sessions
+    (10:00-11:00, 11:00-12:00) never merge.
+    Every merged slot remembers the (filename, pass) pairs and course keys it came from.
+    """
+
+    def __init__(self):
+        self._intervals: dict[int, list[_MergedSlot]] = {}
 
-@app.post("/generate_schedule_ics")
+    def add(self, slot: Slot, source: tuple[str, str], course: str = "") -> None:
+        if slot.end <= slot.start:
+            return
+        ivs = self._intervals.setdefault(slot.weekday, [])
+        merged = _MergedSlot(slot.start, slot.end, {source}, {course} if course else set())
+        # A merge can widen the interval into other slots, so repeat until nothing else joins
+        while hits := [iv for iv in ivs if self._mergeable(iv, merged)]:
+            for iv in hits:
+                ivs.remove(iv)
+                merged.start = min(merged.start, iv.start)
+                merged.end = max(merged.end, iv.end)
+                merged.sources |= iv.sources
+                merged.courses |= iv.courses
+        bisect.insort(ivs, merged, key=lambda iv: (iv.start, iv.end))
+
+    @staticmethod
+    def _mergeable(a: _MergedSlot, b: _MergedSlot) -> bool:
+        if (a.start, a.end) == (b.start, b.end):
+            return True
+        if a.end <= b.start or b.end <= a.start:
+            return False
+        if a.courses & b.courses:
+            return True
+        if a.courses and b.courses:
+            return False
+        return (a.start <= b.start and b.end <= a.end) or (b.start <= a.start and a.end <= b.end)
+
+    def count_for(self, filename: str) -> int:
+        """Number of merged slots that include at least one slot from `filename`."""
+        return sum(
+            1 for ivs in self._intervals.values() for iv in ivs
+            if any(src_file == filename for src_file, _ in iv.sources)
+        )
+
+    def slots(self):
+        """Yield (course, Slot, sorted sources) in a deterministic order; `course` joins the
+        course keys of the merged slot ("" when none was found)."""
+        for weekday in sorted(self._intervals):
+            for iv in self._intervals[weekday]:
+                yield " / ".join(sorted(iv.courses)), Slot(weekday, iv.start, iv.end), sorted(iv.sources)
+
+    def __len__(self) -> int:
+        return sum(len(ivs) for ivs in self._intervals.values())
+
+@router.post("/generate_schedule_ics", dependencies=[Depends(parse_admission)])
 async def generate_schedule_ics(files: List[UploadFile] = File(...)):
     """Detects school schedule in PDF and generates .ics file for Google Calendar."""
     print("[LOG] Starting schedule ICS generation...")
+    uploads = [(file.filename, await file.read()) for file in files]
+    # Parse in a worker thread, as /schedule does, so the event loop stays responsive
+    ics_bytes = await asyncio.to_thread(legacy_schedule_ics, uploads)
+    if ics_bytes is None:
+        return Response(content=b"No schedule found in uploaded files.", media_type="text/plain")
+    return Response(content=ics_bytes, media_type="text/calendar", headers={
+        "Content-Disposition": "attachment; filename=class_schedule.ics"
+    })
+
+def legacy_schedule_ics(uploads: list[tuple[str, bytes]]) -> bytes | None:
+    from ics import Calendar, Event
     all_slots = []
-    for file in files:
-        contenido = await file.read()
-        reader = PdfReader(io.BytesIO(contenido))
-        texto = "\n".join(page.extract_text() or '' for page in reader.pages)
+    for filename, contenido in uploads:
+        texto = "\n".join(pdf_page_texts(contenido))
         slots = extract_schedule(texto)
         if slots:
-            print(f"[LOG] Found {len(slots)} schedule slots in {file.filename}")
+            print(f"[LOG] Found {len(slots)} schedule slots in {filename}")
         all_slots.extend(slots)
     if not all_slots:
-        return Response(content=b"No schedule found in uploaded files.", media_type="text/plain")
+        return None
     # Generate ICS
     cal = Calendar()
     today = datetime.today()
     for idx, (weekday, start, end) in enumerate(all_slots):
         # Find next occurrence of this weekday
-        start_time = datetime.strptime(start, "%H:%M")
-        end_time = datetime.strptime(end, "%H:%M")
         first_date = next_weekday(today, weekday)
         # Create 15 weekly occurrences
         for wk in range(15):
             occ_start = first_date + timedelta(days=7 * wk)
-            event_start = occ_start.replace(hour=start_time.hour, minute=start_time.minute, second=0, microsecond=0)
-            event_end = occ_start.replace(hour=end_time.hour, minute=end_time.minute, second=0, microsecond=0)
+            event_start = occ_start.replace(hour=start // 60, minute=start % 60, second=0, microsecond=0)
+            event_end = occ_start.replace(hour=end // 60, minute=end % 60, second=0, microsecond=0)
             event = Event()
             event.name = f"Class Session"
             event.begin = event_start
@@ -162,20 +577,7 @@ async def generate_schedule_ics(files: List[UploadFile] = File(...)):
             event.uid = str(uuid.uuid4())
             event.description = f"Imported from syllabus PDF."
             cal.events.add(event)
-    ics_bytes = str(cal).encode("utf-8")
-    return Response(content=ics_bytes, media_type="text/calendar", headers={
-        "Content-Disposition": "attachment; filename=class_schedule.ics"
-    })
-from fastapi import FastAPI, UploadFile, File, Response, Form
-from fastapi.middleware.cors import CORSMiddleware
-from typing import List
-from pypdf import PdfReader
-from reportlab.lib.pagesizes import letter
-from reportlab.pdfgen import canvas
-import re
-import io
-from datetime import datetime, timedelta
-import traceback
+    return str(cal).encode("utf-8")
 
 MONTHS = {
     # Spanish
@@ -188,13 +590,21 @@ MONTHS = {
     'november': 11, 'december': 12
 }
 
+# Month alternation built from MONTHS (longest first, so "mayo" wins over "may"): the month must
+# be a real month name, not any word that happens to follow a number.
+MONTH_ALTERNATION = "|".join(sorted(map(re.escape, MONTHS), key=len, reverse=True))
+
+# Tried in priority order. Digit boundaries keep the numeric groups from starting or ending
+# inside a longer number: without them "2026-05-12" read as 26/05/12 and "mayo 2026" as May 20.
 DATE_PATTERNS = [
-    # 12/05 or 12-05
-    r"(?P<d1>\d{1,2})[\/\-](?P<m1>\d{1,2})(?:[\/\-](?P<y1>\d{2,4}))?",
+    # 2026-05-12 or 2026/05/12 (ISO order, checked first)
+    re.compile(r"(?<!\d)(?P<yi>\d{4})(?P<sep>[\/\-])(?P<mi>\d{1,2})(?P=sep)(?P<di>\d{1,2})(?!\d)"),
+    # 12/05 or 12-05 (optional year); not the tail of 2026-05-12
+    re.compile(r"(?<!\d)(?<!\d[\/\-])(?P<d1>\d{1,2})[\/\-](?P<m1>\d{1,2})(?:[\/\-](?P<y1>\d{4}|\d{2}))?(?!\d)"),
     # 12 de mayo (optional year) / 12 mayo / 12 May
-    r"(?P<d2>\d{1,2})\s*(?:de\s*)?(?P<m2>\w+)(?:\s+de\s+(?P<y2>\d{4}))?",
+    re.compile(rf"(?<!\d)(?P<d2>\d{{1,2}})\s*(?:de\s*)?(?P<m2>{MONTH_ALTERNATION})\b(?:\s+de\s+(?P<y2>\d{{4}})(?!\d))?"),
     # mayo 12 (optional year) / May 12
-    r"(?P<m3>\w+)\s+(?P<d3>\d{1,2})(?:\s+de\s+(?P<y3>\d{4}))?"
+    re.compile(rf"\b(?P<m3>{MONTH_ALTERNATION})\s+(?P<d3>\d{{1,2}})(?!\d)(?:\s+de\s+(?P<y3>\d{{4}})(?!\d))?"),
 ]
 
 EVENT_KEYWORDS = [
@@ -204,47 +614,74 @@ EVENT_KEYWORDS = [
     'exam', 'deadline', 'due', 'assignment', 'project'
 ]
 
-def try_parse_date(fragment: str) -> datetime | None:
-    """Try to normalize a date fragment to datetime (default hour 09:00). Supports Spanish and English."""
-    lower = fragment.lower()
+EVENT_KEYWORD_PATTERNS = [(kw, re.compile(kw)) for kw in EVENT_KEYWORDS]
+
+@functools.lru_cache(maxsize=4096)
+def _date_parts(fragment: str) -> tuple[int, int, int | None] | None:
+    """(day, month, year or None) of the first plausible date in a lowercase fragment. Memoized:
+    syllabi repeat the same few date strings, and the result does not depend on the reference date."""
     for pattern in DATE_PATTERNS:
-        m = re.search(pattern, lower)
-        if not m:
-            continue
-        day = None
-        month = None
-        year = None
-        if m.groupdict().get('d1'):
-            day = int(m.group('d1'))
-            month = int(m.group('m1'))
-            y = m.group('y1')
-            if y:
-                year = int(y if len(y) == 4 else ('20' + y))
-        elif m.groupdict().get('d2'):
-            day = int(m.group('d2'))
-            month_name = m.group('m2')
-            month = MONTHS.get(month_name.lower())
-            y = m.group('y2')
-            if y:
-                year = int(y)
-        elif m.groupdict().get('d3'):
-            day = int(m.group('d3'))
-            month_name = m.group('m3')
-            month = MONTHS.get(month_name.lower())
-            y = m.group('y3')
-            if y:
-                year = int(y)
-        if day and month:
-            if not year:
-                today = datetime.today()
-                tentative = datetime(today.year, month, day)
-                if (tentative - today).days < -30:
-                    tentative = datetime(today.year + 1, month, day)
-                return tentative.replace(hour=9, minute=0)
-            return datetime(year, month, day, 9, 0)
+        for m in pattern.finditer(fragment):
+            g = m.groupdict()
+            if g.get('di'):
+                day, month, year = int(g['di']), int(g['mi']), int(g['yi'])
+            elif g.get('d1'):
+                day, month, y = int(g['d1']), int(g['m1']), g['y1']
+                year = int(y if len(y) == 4 else '20' + y) if y else None
+            elif g.get('d2'):
+                day, month, y = int(g['d2']), MONTHS[g['m2']], g['y2']
+                year = int(y) if y else None
+            else:
+                day, month, y = int(g['d3']), MONTHS[g['m3']], g['y3']
+                year = int(y) if y else None
+            if 1 <= day <= 31 and 1 <= month <= 12:
+                return day, month, year
     return None
 
-# NOTE: Removed duplicate FastAPI() instantiation to preserve previously registered routes (e.g., /generate_schedule_ics)
+class DateNormalizer:
+    """Normalize date fragments to datetimes (default hour 09:00). Supports Spanish and English.
+    Year-less dates resolve against one fixed reference date (their next occurrence, allowing
+    30 days in the past), so every date of a request is read the same way. Create one per request:
+    resolved fragments are memoized on the instance.
+    """
+
+    def __init__(self, reference: date | None = None):
+        self.reference = reference or date.today()
+        self._resolved: dict[str, datetime | None] = {}
+
+    def normalize(self, fragment: str) -> datetime | None:
+        try:
+            return self._resolved[fragment]
+        except KeyError:
+            pass
+        when = None
+        parts = _date_parts(fragment.lower())
+        if parts is not None:
+            day, month, year = parts
+            try:
+                if year is None:
+                    year = self.reference.year
+                    if (date(year, month, day) - self.reference).days < -30:
+                        year += 1
+                when = datetime(year, month, day, 9, 0)
+            except ValueError:  # 31/04, 29/02 outside leap years, 5-digit years
+                pass
+        self._resolved[fragment] = when
+        return when
+
+def try_parse_date(fragment: str) -> datetime | None:
+    """Try to normalize a date fragment to datetime (default hour 09:00), relative to today."""
+    return DateNormalizer().normalize(fragment)
+
+class ImportantDate(NamedTuple):
+    """An event keyword found next to a date, e.g. an exam on 2026-05-12 09:00."""
+    kind: str
+    when: datetime
+    fragment: str
+    context: str
+
+    def __str__(self) -> str:
+        return f"{self.kind.capitalize()}: {self.fragment} | {self.context}"
 
 # Permitir CORS para frontend en localhost:5173 y 3000
 ALLOWED_ORIGINS = [
@@ -256,38 +693,96 @@ ALLOWED_ORIGINS = [
     "https://syllabus-unifier-web.onrender.com"
 ]
 
-app.add_middleware(
-    CORSMiddleware,
-    allow_origins=ALLOWED_ORIGINS,
-    allow_credentials=True,
-    allow_methods=["*"],  # incluye OPTIONS
-    allow_headers=["*"],
-)
-
-@app.get("/health")
+@router.get("/health")
 def health():
     return {"status": "ok"}
 
+@router.get("/metrics")
+def metrics(request: Request):
+    index = request.app.state.syllabus_index
+    return {
+        "admission": request.app.state.admission.snapshot(),
+        "rate_limit": request.app.state.rate_limiter.snapshot(),
+        "artifact_cache": request.app.state.artifact_cache.snapshot(),
+        "jobs": request.app.state.jobs.snapshot(),
+        "page_cache": PAGE_CACHE.snapshot(),
+        "memory": request.app.state.memory.snapshot(),
+        "index": index.snapshot() if index is not None else None,
+    }
+
 # Manejo explícito de preflight para /generar (útil si algún proxy o servidor intermedio no respeta CORS por defecto)
-@app.options("/generar")
+@router.options("/generar")
 def preflight_generar():
     return Response(status_code=200)
 
-def extract_dates(text):
+def _merge_spans(spans: list[tuple[int, int]]) -> list[tuple[int, int]]:
+    merged: list[tuple[int, int]] = []
+    for start, end in sorted(spans):
+        if merged and start <= merged[-1][1]:
+            merged[-1] = (merged[-1][0], max(merged[-1][1], end))
+        else:
+            merged.append((start, end))
+    return merged
+
+def _keyword_anchors(lower: str, spans: list[tuple[int, int]]) -> list[tuple[int, int]]:
+    """Merge keyword spans that belong to one phrase: overlapping ("exam" inside "examen") or
+    separated by a few characters without digits ("project due", "entrega del proyecto")."""
+    anchors: list[tuple[int, int]] = []
+    for start, end in sorted(spans):
+        if anchors and (start <= anchors[-1][1] or (
+            start - anchors[-1][1] <= 12 and not any(ch.isdigit() for ch in lower[anchors[-1][1]:start])
+        )):
+            anchors[-1] = (anchors[-1][0], max(anchors[-1][1], end))
+        else:
+            anchors.append((start, end))
+    return anchors
+
+def extract_dates(text: str, normalizer: DateNormalizer | None = None) -> list[ImportantDate]:
+    """Dates found within 120 characters of an event keyword, normalized by `normalizer`
+    (default: relative to today). Keywords without a valid date nearby are skipped.
+    A keyword takes the nearest valid date in its window with no other keyword in between, so
+    a date is never borrowed from another event: in "Midterm exam: 3/15. Final project due
+    12 de mayo" the project gets 12 de mayo and the exam nothing (3/15 is not a valid day/month).
+    Dates after the keyword are preferred ("Entrega: 3/06" below an exam line takes 3/06), then
+    the nearest one, then the higher-priority pattern. Each pattern scans the merged keyword
+    windows once.
+    """
+    normalizer = normalizer or DateNormalizer()
+    lower = text.lower()
+    occurrences = [
+        (kw, m_kw.start(), m_kw.end()) for kw, kw_re in EVENT_KEYWORD_PATTERNS for m_kw in kw_re.finditer(lower)
+    ]
+    windows = [(max(0, start - 120), min(len(text), end + 120)) for _, start, end in occurrences]
+    anchors = _keyword_anchors(lower, [(start, end) for _, start, end in occurrences])
+    anchor_starts = [start for start, _ in anchors]
+    found = []  # (start, end, pattern priority, fragment, datetime), valid dates only
+    for priority, pattern in enumerate(DATE_PATTERNS):
+        for span_start, span_end in _merge_spans(windows):
+            for m in pattern.finditer(lower, span_start, span_end):
+                when = normalizer.normalize(m.group(0))
+                if when is not None:
+                    found.append((m.start(), m.end(), priority, m.group(0), when))
+    found.sort(key=lambda d: (d[0], d[1], d[2]))
+    starts = [d[0] for d in found]
     results = []
-    for kw in EVENT_KEYWORDS:
-        for m_kw in re.finditer(kw, text.lower()):
-            start_ctx = max(0, m_kw.start() - 120)
-            end_ctx = min(len(text), m_kw.end() + 120)
-            contexto = text[start_ctx:end_ctx]
-            fecha_encontrada = None
-            for pattern in DATE_PATTERNS:
-                m_date = re.search(pattern, contexto.lower())
-                if m_date:
-                    fecha_encontrada = m_date.group(0)
-                    break
-            if fecha_encontrada:
-                results.append(f"{kw.capitalize()}: {fecha_encontrada} | {contexto.strip().replace('\n', ' ')}")
+    for (kw, kw_start, _), (start_ctx, end_ctx) in zip(occurrences, windows):
+        i = bisect.bisect_right(anchor_starts, kw_start) - 1
+        a_start, a_end = anchors[i]
+        # Dates must lie between the neighbouring keywords, which own everything beyond them
+        lo = max(start_ctx, anchors[i - 1][1] if i > 0 else 0)
+        hi = min(end_ctx, anchors[i + 1][0] if i + 1 < len(anchors) else len(text))
+        best = None
+        for d in found[bisect.bisect_left(starts, lo):bisect.bisect_left(starts, hi)]:
+            if d[1] > hi:
+                continue
+            after = d[0] >= a_end
+            rank = (not after, d[0] - a_end if after else max(0, a_start - d[1]), d[2])
+            if best is None or rank < best[0]:
+                best = (rank, d)
+        if best is not None:
+            fragment, when = best[1][3], best[1][4]
+            contexto = text[start_ctx:end_ctx].strip().replace('\n', ' ')
+            results.append(ImportantDate(kw, when, fragment, contexto))
     return results
 
 def extract_section(text, section_names, max_length=1000):
@@ -322,10 +817,27 @@ EVAL_LABEL_HINTS = [
     "labs", "participation", "attendance", "quiz", "quizzes", "presentation"
 ]
 
-def extract_evaluation_items(text: str) -> list[str]:
+def _dedup_eval_items(items: list[EvalItem]) -> list[EvalItem]:
+    """Deduplicate by label (case-insensitive) + percent, keeping order."""
+    seen = set()
+    out: list[EvalItem] = []
+    for item in items:
+        key = (item.label.lower(), item.pct)
+        if key in seen:
+            continue
+        seen.add(key)
+        out.append(item)
+    return out
+
+# Pattern A: Label before percent (e.g., "Examen Final - 30%")
+EVAL_LABEL_PCT_RE = re.compile(r"(?P<label>[A-Za-zÁÉÍÓÚáéíóúñÑ\/( )]{3,}?)\s*[:\-–—]?\s*(?P<pct>\d{1,3})\s*%", re.IGNORECASE)
+# Pattern B: Percent before label (e.g., "30% Proyecto Integrador")
+EVAL_PCT_LABEL_RE = re.compile(r"(?P<pct>\d{1,3})\s*%\s*(?P<label>[A-Za-zÁÉÍÓÚáéíóúñÑ\/( )]{3,})", re.IGNORECASE)
+
+def extract_evaluation_items(text: str) -> list[EvalItem]:
     """Extract evaluation criteria lines like 'Exam - 20%' or '20% Homework'.
     Prefer scanning inside an evaluation/grading section; fallback to keyword lines.
-    Returns list of 'Label: XX%'.
+    Returns list of EvalItem(label, pct).
     """
     # 1) Try to narrow to an evaluation section
     eval_section = extract_section(
@@ -339,11 +851,9 @@ def extract_evaluation_items(text: str) -> list[str]:
     )
     search_text = eval_section if eval_section and eval_section != "Not found" else text
 
-    items: list[tuple[str, int]] = []
-    # Pattern A: Label before percent (e.g., "Examen Final - 30%")
-    pat_a = re.compile(r"(?P<label>[A-Za-zÁÉÍÓÚáéíóúñÑ\/( )]{3,}?)\s*[:\-–—]?\s*(?P<pct>\d{1,3})\s*%", re.IGNORECASE)
-    # Pattern B: Percent before label (e.g., "30% Proyecto Integrador")
-    pat_b = re.compile(r"(?P<pct>\d{1,3})\s*%\s*(?P<label>[A-Za-zÁÉÍÓÚáéíóúñÑ\/( )]{3,})", re.IGNORECASE)
+    items: list[EvalItem] = []
+    pat_a = EVAL_LABEL_PCT_RE
+    pat_b = EVAL_PCT_LABEL_RE
 
     # Split by lines to reduce cross-line noise
     for raw_line in search_text.splitlines():
@@ -368,18 +878,14 @@ def extract_evaluation_items(text: str) -> list[str]:
         # Heuristic: drop lone words like 'total', 'nota', 'score'
         if _strip_accents(label.lower()) in {"total", "nota", "score"}:
             continue
-        items.append((label, pct))
+        items.append(EvalItem(label, pct))
 
-    # Deduplicate by label+percent, keep order
-    seen = set()
-    out: list[str] = []
-    for label, pct in items:
-        key = (label.lower(), pct)
-        if key in seen:
-            continue
-        seen.add(key)
-        out.append(f"{label}: {pct}%")
-    return out
+    return _dedup_eval_items(items)
+
+# 1.1 or 1.1.1 patterns
+SYLLABUS_MULTI_RE = re.compile(r"^\s*(?P<num>\d+(?:\.\d+){1,3})\s*[\)\.-]?\s+(?P<title>\S(?:.*\S)?)\s*$")
+# 1. patterns (single level with a dot, parenthesis, or dash)
+SYLLABUS_SINGLE_RE = re.compile(r"^\s*(?P<num>\d+)\s*[\)\.-]\s+(?P<title>\S(?:.*\S)?)\s*$")
 
 def extract_enumerated_syllabus(text: str, max_items: int = 100) -> list[str]:
     """Extract enumerated syllabus topics like:
@@ -388,10 +894,8 @@ def extract_enumerated_syllabus(text: str, max_items: int = 100) -> list[str]:
     """
     items: list[str] = []
     lines = text.splitlines()
-    # 1.1 or 1.1.1 patterns
-    pat_multi = re.compile(r"^\s*(?P<num>\d+(?:\.\d+){1,3})\s*[\)\.-]?\s+(?P<title>\S(?:.*\S)?)\s*$")
-    # 1. patterns (single level with a dot, parenthesis, or dash)
-    pat_single = re.compile(r"^\s*(?P<num>\d+)\s*[\)\.-]\s+(?P<title>\S(?:.*\S)?)\s*$")
+    pat_multi = SYLLABUS_MULTI_RE
+    pat_single = SYLLABUS_SINGLE_RE
     for line in lines:
         m = pat_multi.match(line) or pat_single.match(line)
         if not m:
@@ -423,8 +927,295 @@ def pdf_truncated(raw: bytes) -> bool:
     tail = raw[-64:]
     return b'%%EOF' not in tail
 
-def extract_pdf_text(bytes_in: bytes, errores: list[str], fname: str) -> tuple[str, list[str]]:
-    """Return extracted text and a list of warnings for this file."""
+# ------------------------------
+# PDF text backend selection
+# ------------------------------
+# The backends themselves (PypdfBackend, PdfiumBackend, MupdfBackend) live in pdf_extract.py.
+# Preference order for SYLLABUS_PDF_BACKEND=auto (fastest first)
+TEXT_BACKEND_AUTO_ORDER = ("mupdf", "pdfium", "pypdf")
+_TEXT_BACKEND_MODULES = {"pypdf": ("pypdf",), "pdfium": ("pypdfium2",), "mupdf": ("pymupdf", "fitz")}
+
+def _backend_available(name: str) -> bool:
+    for module in _TEXT_BACKEND_MODULES[name]:
+        try:
+            __import__(module)
+        except ImportError:
+            continue
+        return True
+    return False
+
+@functools.cache
+def get_text_backend(name: str | None = None):
+    """Return the text backend to use.
+    `name` (or the SYLLABUS_PDF_BACKEND env var) is one of pypdf, pdfium, mupdf or auto;
+    default pypdf. auto picks the fastest installed engine. Unavailable choices fall back to pypdf.
+    """
+    name = (name or os.getenv("SYLLABUS_PDF_BACKEND") or "pypdf").strip().lower()
+    if name == "auto":
+        name = next(n for n in TEXT_BACKEND_AUTO_ORDER if n == "pypdf" or _backend_available(n))
+    if name not in TEXT_BACKENDS:
+        print(f"[WARN] Unknown PDF backend '{name}', using pypdf")
+        name = "pypdf"
+    elif name != "pypdf" and not _backend_available(name):
+        print(f"[WARN] PDF backend '{name}' is not installed, using pypdf")
+        name = "pypdf"
+    return TEXT_BACKENDS[name]()
+
+def pdf_page_texts(pdf_bytes: bytes, backend: str | None = None, max_pages: int | None = None) -> list[str]:
+    """Per-page text of a PDF using the configured backend.
+    Pages already seen (same content hash) come from PAGE_CACHE when the backend is slower than
+    hashing (`cache_pages`, i.e. pypdf); large documents are split into page ranges extracted in
+    parallel worker processes. `max_pages` reads only the first pages.
+    """
+    text_backend = get_text_backend(backend)
+    kind = f"text:{text_backend.name}"
+    keys = PAGE_CACHE.page_keys(pdf_bytes) if text_backend.cache_pages else None
+    limit = None
+    if max_pages is not None and (len(keys) if keys is not None else _pdf_page_count(pdf_bytes)) > max_pages:
+        # Degraded request (memory soft limit): only the first pages, read serially
+        limit = range(max_pages)
+        keys = keys[:max_pages] if keys is not None else None
+    if keys is None:
+        return text_backend.page_texts(pdf_bytes, limit) if limit else _extract_page_texts(pdf_bytes, text_backend)
+    texts = [PAGE_CACHE.get(key, kind) for key in keys]
+    missing = [i for i, text in enumerate(texts) if text is _MISS]
+    if not missing:
+        return texts
+    if limit is None and (len(missing) == len(keys) or len(missing) >= PARALLEL_MIN_PAGES):
+        # Mostly new document: extract it whole (possibly in parallel) and keep the missing pages
+        full = _extract_page_texts(pdf_bytes, text_backend)
+        if len(full) != len(keys):  # engines disagree on the page count of a damaged file
+            return full
+        fresh = [full[i] for i in missing]
+    else:
+        fresh = text_backend.page_texts(pdf_bytes, missing)
+    for i, text in zip(missing, fresh):
+        texts[i] = text
+        PAGE_CACHE.put(keys[i], kind, text)
+    return texts
+
+def _extract_page_texts(pdf_bytes: bytes, text_backend) -> list[str]:
+    ranges = _parallel_page_ranges(pdf_bytes)
+    if ranges:
+        return _run_page_ranges(pdf_bytes, _page_texts_worker, ranges, text_backend.name)
+    return text_backend.page_texts(pdf_bytes)
+
+# ------------------------------
+# Page-parallel extraction for very large PDFs
+# ------------------------------
+# Documents with at least SYLLABUS_PARALLEL_MIN_PAGES pages (default 40) are written once to a
+# temporary file (RAM-backed /dev/shm when available); each worker process opens it independently
+# (memory-mapped, or by path for native engines) and extracts its own page range. Results are
+# stitched back in page order. SYLLABUS_PARALLEL_WORKERS=0/1 disables it; by default every web
+# worker gets its share of the cores (cores / WEB_CONCURRENCY), so the pools of all workers
+# together never exceed one process per core. The workers live in pdf_extract.py so the
+# spawned children do not import this module (and build the app).
+PARALLEL_MIN_PAGES = int(_env_float("SYLLABUS_PARALLEL_MIN_PAGES", 40))
+PARALLEL_WORKERS = int(_env_float(
+    "SYLLABUS_PARALLEL_WORKERS",
+    max(1, (os.cpu_count() or 1) // max(1, int(_env_float("WEB_CONCURRENCY", 1)))),
+))
+PARALLEL_MIN_PAGES_PER_RANGE = 8
+
+@functools.cache
+def _page_pool() -> ProcessPoolExecutor:
+    # spawn: forking a process that runs the event loop (and maybe threads) is not safe
+    import multiprocessing
+    return ProcessPoolExecutor(max_workers=PARALLEL_WORKERS, mp_context=multiprocessing.get_context("spawn"))
+
+def _pdf_page_count(pdf_bytes: bytes) -> int:
+    from pypdf import PdfReader
+    return len(PdfReader(io.BytesIO(pdf_bytes)).pages)
+
+def _parallel_page_ranges(pdf_bytes: bytes, pages: range | None = None) -> list[range]:
+    """Page ranges (within `pages`, default the whole document) to extract in parallel,
+    or [] when they should be read serially.
+    """
+    # Counting pages costs a parse of the page tree; small files cannot be worth splitting anyway
+    if PARALLEL_WORKERS <= 1 or len(pdf_bytes) < 64 * 1024:
+        return []
+    if pages is None:
+        try:
+            pages = range(_pdf_page_count(pdf_bytes))
+        except Exception:
+            return []
+    if len(pages) < PARALLEL_MIN_PAGES:
+        return []
+    size = max(PARALLEL_MIN_PAGES_PER_RANGE, math.ceil(len(pages) / PARALLEL_WORKERS))
+    return [range(start, min(start + size, pages.stop)) for start in range(pages.start, pages.stop, size)]
+
+def _run_page_ranges(pdf_bytes: bytes, worker, ranges: list[range], *args) -> list:
+    """Run `worker(path, start, stop, *args)` for every range in the process pool; concatenate in page order."""
+    shm_dir = "/dev/shm" if os.path.isdir("/dev/shm") else None
+    with tempfile.NamedTemporaryFile(suffix=".pdf", dir=shm_dir) as tmp:
+        tmp.write(pdf_bytes)
+        tmp.flush()
+        futures = [_page_pool().submit(worker, tmp.name, r.start, r.stop, *args) for r in ranges]
+        out: list = []
+        for fut in futures:
+            out.extend(fut.result())
+        return out
+
+# ------------------------------
+# Page-level extraction cache
+# ------------------------------
+# Syllabi of one faculty share byte-identical pages (regulations, grading policy, bibliography
+# templates). Text, words and tables of a page are cached under a hash of what determines them:
+# the decoded content stream plus the fonts and form XObjects it draws with, so a shared stream
+# rendered with different fonts never hits another document's entry.
+_MISS = object()
+
+def _approx_size(value) -> int:
+    """Rough in-memory size of a cached value, for the byte bound."""
+    if isinstance(value, str):
+        return 50 + len(value)
+    if isinstance(value, dict):
+        return 64 + sum(_approx_size(k) + _approx_size(v) for k, v in value.items())
+    if isinstance(value, (list, tuple)):
+        return 56 + sum(_approx_size(v) for v in value)
+    return 32
+
+class PageCache:
+    """Thread-safe LRU of per-page results keyed by (page hash, kind), bounded by entries and bytes."""
+
+    def __init__(self, max_entries: int, max_bytes: int, max_documents: int = 32):
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self.max_documents = max_documents
+        self._items: OrderedDict[tuple[str, str], tuple[object, int]] = OrderedDict()
+        self._documents: OrderedDict[bytes, list[str | None]] = OrderedDict()
+        self._bytes = 0
+        self._lock = threading.Lock()
+        self.hits: dict[str, int] = {}
+        self.misses: dict[str, int] = {}
+
+    @classmethod
+    def from_env(cls) -> "PageCache":
+        """SYLLABUS_PAGE_CACHE_ENTRIES (default 4096; 0 disables) and SYLLABUS_PAGE_CACHE_MB (default 64)."""
+        return cls(
+            max_entries=int(_env_float("SYLLABUS_PAGE_CACHE_ENTRIES", 4096)),
+            max_bytes=int(_env_float("SYLLABUS_PAGE_CACHE_MB", 64) * 1024 * 1024),
+        )
+
+    @property
+    def enabled(self) -> bool:
+        return self.max_entries > 0
+
+    def get(self, key: str | None, kind: str):
+        """Cached value, or _MISS."""
+        if key is None:
+            return _MISS
+        with self._lock:
+            item = self._items.get((key, kind))
+            if item is None:
+                self.misses[kind] = self.misses.get(kind, 0) + 1
+                return _MISS
+            self._items.move_to_end((key, kind))
+            self.hits[kind] = self.hits.get(kind, 0) + 1
+            return item[0]
+
+    def put(self, key: str | None, kind: str, value) -> None:
+        if key is None or not self.enabled:
+            return
+        size = _approx_size(value)
+        if size > self.max_bytes:
+            return
+        with self._lock:
+            old = self._items.pop((key, kind), None)
+            if old is not None:
+                self._bytes -= old[1]
+            self._items[(key, kind)] = (value, size)
+            self._bytes += size
+            while self._items and (len(self._items) > self.max_entries or self._bytes > self.max_bytes):
+                _, (_, evicted) = self._items.popitem(last=False)
+                self._bytes -= evicted
+
+    def page_keys(self, pdf_bytes: bytes) -> list[str | None] | None:
+        """Content hash of every page (None for pages that could not be hashed), or None when the
+        cache is disabled or the document cannot be read. Memoized per document, since the text
+        layer and the table pass of one upload ask for the same keys."""
+        if not self.enabled:
+            return None
+        doc = hashlib.blake2b(pdf_bytes, digest_size=16).digest()
+        with self._lock:
+            keys = self._documents.get(doc)
+            if keys is not None:
+                self._documents.move_to_end(doc)
+                return keys
+        try:
+            keys = _pdf_page_content_keys(pdf_bytes)
+        except Exception:
+            return None
+        with self._lock:
+            self._documents[doc] = keys
+            while len(self._documents) > self.max_documents:
+                self._documents.popitem(last=False)
+        return keys
+
+    def snapshot(self) -> dict:
+        with self._lock:
+            kinds = sorted(set(self.hits) | set(self.misses))
+            return {
+                "entries": len(self._items),
+                "bytes": self._bytes,
+                "kinds": {
+                    kind: {
+                        "hits": self.hits.get(kind, 0),
+                        "misses": self.misses.get(kind, 0),
+                        "hit_rate": round(self.hits.get(kind, 0) / max(1, self.hits.get(kind, 0) + self.misses.get(kind, 0)), 3),
+                    }
+                    for kind in kinds
+                },
+            }
+
+PAGE_CACHE = PageCache.from_env()
+
+def _hash_resources(h, resources, depth: int = 0) -> None:
+    """Feed the fonts and form XObjects of a resource dictionary into `h` (forms recursively)."""
+    if resources is None or depth > 3:
+        return
+    resources = resources.get_object()
+    fonts = resources.get("/Font")
+    if fonts is not None:
+        fonts = fonts.get_object()
+        for name in sorted(fonts):
+            font = fonts[name].get_object()
+            encoding = font.get("/Encoding")
+            h.update(f"{name}|{font.get('/Subtype')}|{font.get('/BaseFont')}|{font.get('/Widths')}".encode())
+            h.update(repr(encoding.get_object() if encoding is not None else None).encode())
+            to_unicode = font.get("/ToUnicode")
+            if to_unicode is not None:
+                h.update(to_unicode.get_object().get_data())
+    xobjects = resources.get("/XObject")
+    if xobjects is not None:
+        xobjects = xobjects.get_object()
+        for name in sorted(xobjects):
+            xobj = xobjects[name].get_object()
+            h.update(f"{name}|{xobj.get('/Subtype')}".encode())
+            if xobj.get("/Subtype") == "/Form":
+                h.update(xobj.get_data())
+                _hash_resources(h, xobj.get("/Resources"), depth + 1)
+
+def _pdf_page_content_keys(pdf_bytes: bytes) -> list[str | None]:
+    from pypdf import PdfReader
+    reader = PdfReader(io.BytesIO(pdf_bytes))
+    keys: list[str | None] = []
+    for page in reader.pages:
+        try:
+            h = hashlib.blake2b(digest_size=16)
+            contents = page.get_contents()
+            h.update(contents.get_data() if contents is not None else b"")
+            h.update(f"|{list(page.mediabox)}|{page.get('/Rotate', 0)}|".encode())
+            _hash_resources(h, page.get("/Resources"))
+            keys.append(h.hexdigest())
+        except Exception:
+            keys.append(None)
+    return keys
+
+def extract_pdf_pages(
+    bytes_in: bytes, errores: list[str], fname: str, max_pages: int | None = None,
+) -> tuple[list[str], list[str]]:
+    """Return the extracted text of each page (at most `max_pages`) and a list of warnings for this file."""
     warnings: list[str] = []
     sanitized = sanitize_pdf_header(bytes_in)
     if sanitized is not bytes_in:
@@ -432,83 +1223,215 @@ def extract_pdf_text(bytes_in: bytes, errores: list[str], fname: str) -> tuple[s
     if pdf_truncated(bytes_in):
         warnings.append("EOF marker missing or truncated")
     try:
-        reader = PdfReader(io.BytesIO(sanitized))
-        texto = "\n".join(page.extract_text() or '' for page in reader.pages)
-        if not texto.strip():
+        pages = pdf_page_texts(sanitized, max_pages=max_pages)
+        if not any(p.strip() for p in pages):
             warnings.append("No extractable text (possible image-based PDF)")
-        return texto, warnings
+        return pages, warnings
     except Exception as e:
         errores.append(f"{fname}: PDF parse failed: {e}")
-        return "", warnings + ["Parse failed"]
+        return [], warnings + ["Parse failed"]
+
+def extract_pdf_text(bytes_in: bytes, errores: list[str], fname: str) -> tuple[str, list[str]]:
+    """Return extracted text and a list of warnings for this file."""
+    pages, warnings = extract_pdf_pages(bytes_in, errores, fname)
+    return "\n".join(pages), warnings
+
+# ------------------------------
+# Multi-course PDF segmentation
+# ------------------------------
+# Labelled course header near the top of a page, e.g. "Asignatura: Cálculo I" or "Course: Physics"
+COURSE_HEADER_RE = re.compile(
+    r"^\s*(?:nombre\s+de\s+la\s+)?(?:asignatura|materia|curso|unidad\s+de\s+aprendizaje|course(?:\s+(?:title|name))?|subject)"
+    r"\s*[:\-–—]\s*(?P<name>\S.{2,80}?)\s*$",
+    re.IGNORECASE,
+)
+COURSE_HEADER_MAX_LINES = 8
+
+class CourseUnit(NamedTuple):
+    """One logical course inside an uploaded PDF: its name, 0-based page range and text."""
+    name: str
+    pages: range
+    text: str
+
+def _page_course_header(page_text: str) -> str | None:
+    """Course name from a labelled header in the first lines of the page, if any."""
+    seen = 0
+    for line in page_text.splitlines():
+        if not line.strip():
+            continue
+        m = COURSE_HEADER_RE.match(line)
+        if m:
+            return re.sub(r"\s+", " ", m.group('name')).strip()
+        seen += 1
+        if seen >= COURSE_HEADER_MAX_LINES:
+            break
+    return None
+
+def segment_courses(default_name: str, page_texts: list[str]) -> list[CourseUnit]:
+    """Split a document into per-course units using the course header repeated at the top of pages.
+    A page whose header names a different course than the current one starts a new unit; pages
+    without a header (or repeating the same one) continue it. Documents with a single course
+    come back as one unit named `default_name`.
+    """
+    whole = [CourseUnit(default_name, range(len(page_texts)), "\n".join(page_texts))]
+    starts: list[tuple[int, str]] = []
+    current_key = None
+    for idx, page_text in enumerate(page_texts):
+        name = _page_course_header(page_text)
+        if not name:
+            continue
+        key = _strip_accents(name.lower())
+        if key != current_key:
+            # Pages before the first header (cover, index) belong to the first course
+            starts.append((0 if not starts else idx, name))
+            current_key = key
+    if len(starts) < 2:
+        return whole
+    units: list[CourseUnit] = []
+    for i, (start, name) in enumerate(starts):
+        stop = starts[i + 1][0] if i + 1 < len(starts) else len(page_texts)
+        units.append(CourseUnit(name, range(start, stop), "\n".join(page_texts[start:stop])))
+    return units
+
+# Header words that mark the evaluation/grading table on a page (accent-stripped, lowercase)
+EVAL_REGION_HINTS = (
+    "ponderacion", "evaluacion", "calificacion", "criterios",
+    "evaluation", "grading", "assessment", "weight",
+)
+
+# Table settings for the cropped evaluation region: same line strategy as the defaults,
+# but ignore very short edges (underlines, bullets) that only slow down cell detection.
+EVAL_TABLE_SETTINGS = {
+    "vertical_strategy": "lines",
+    "horizontal_strategy": "lines",
+    "snap_tolerance": 3,
+    "join_tolerance": 3,
+    "intersection_tolerance": 3,
+    "edge_min_length": 10,
+}
+
+def _page_cached(key: str | None, kind: str, compute):
+    """PAGE_CACHE lookup for one page, computing and storing the value on a miss."""
+    value = PAGE_CACHE.get(key, kind)
+    if value is _MISS:
+        value = compute()
+        PAGE_CACHE.put(key, kind, value)
+    return value
+
+def _find_eval_region_top(page, key: str | None = None) -> float | None:
+    """Locate the evaluation header in the page words; return its top coordinate or None."""
+    words = _page_cached(key, "words", lambda: page.extract_words(keep_blank_chars=False) or [])
+    tops = [
+        w.get('top', 0) for w in words
+        if any(h in _strip_accents((w.get('text') or '').lower()) for h in EVAL_REGION_HINTS)
+    ]
+    return min(tops) if tops else None
 
-def extract_evaluation_items_from_pdf(pdf_bytes: bytes) -> list[str]:
+def _eval_candidate_pages(page_texts: list[str], pages: range) -> list[int]:
+    """Use the (cheap) text backend layer to find the pages that mention an evaluation header."""
+    candidates: list[int] = []
+    for idx in pages:
+        low = _strip_accents(page_texts[idx].lower())
+        if any(h in low for h in EVAL_REGION_HINTS):
+            candidates.append(idx)
+    return candidates
+
+def _region_tables(page, crop_top: float) -> tuple[list[list], bool]:
+    """Tables of the page below `crop_top`, and whether the last one reaches the bottom margin.
+    Coordinates follow page.bbox, whose origin is not (0, 0) when the MediaBox/CropBox is offset."""
+    x0, top, x1, bottom = page.bbox
+    region = page.crop((x0, crop_top, x1, bottom)) if crop_top > top else page
+    tables = region.find_tables(table_settings=EVAL_TABLE_SETTINGS) or []
+    return [table.extract() for table in tables], bool(tables) and tables[-1].bbox[3] >= bottom - 72
+
+def _extract_eval_rows_fast(
+    pdf, candidate_pages: list[int], stop: int,
+    keys: list[str | None] | None = None, budget: MemoryBudget | None = None,
+) -> list[EvalItem]:
+    """Fast path: only run table detection on the cropped region below the evaluation header
+    of the candidate pages. If the last table reaches the bottom of the page, the next page is
+    scanned as well so tables split across pages are not cut short.
+    `keys` are the page content hashes used to reuse words and tables from PAGE_CACHE;
+    `budget` is checked after every page and stops the scan once over its soft limit.
+    """
+    results: list[EvalItem] = []
+    pages = pdf.pages
+    queue = list(candidate_pages)
+    visited: set[int] = set()
+    while queue:
+        idx = queue.pop(0)
+        if idx in visited or idx >= min(stop, len(pages)):
+            continue
+        visited.add(idx)
+        page = pages[idx]
+        key = keys[idx] if keys is not None else None
+        top = _find_eval_region_top(page, key) if idx in candidate_pages else None
+        # Header found: crop from slightly above it; continuation pages are scanned whole
+        crop_top = max(0, top - 40) if top is not None else 0
+        region_key = f"{key}@{crop_top:g}" if key else None
+        tables, reaches_bottom = _page_cached(region_key, "eval_tables", lambda: _region_tables(page, crop_top))
+        for table in tables:
+            results.extend(_eval_rows_from_table(table))
+        if budget is not None and budget.check():
+            break
+        # Table touching the bottom margin likely continues on the next page
+        if reaches_bottom:
+            queue.insert(0, idx + 1)
+    return results
+
+def extract_evaluation_items_from_pdf(
+    pdf_bytes: bytes,
+    fast_path: bool = True,
+    pages: range | None = None,
+    page_texts: list[str] | None = None,
+    budget: MemoryBudget | None = None,
+) -> list[EvalItem]:
     """Try to extract evaluation criteria from table structures using pdfplumber.
     It looks for rows where one cell is a numeric weight (e.g., 40 or 40%),
     and uses other cells in the same row to form the label.
+    Table detection first runs only on the region around the evaluation header found in the
+    text layer; the full-page scan of every page is kept as a fallback.
+    `pages` restricts the search to one course unit; `page_texts` reuses an existing text layer.
+    Words and tables of pages seen before (same content hash) come from PAGE_CACHE.
+    `budget` is checked after every page: the soft limit ends the scan, the hard limit raises.
     """
+    pdfplumber = _load_pdfplumber()
     if pdfplumber is None:
         return []
-    results: list[tuple[str, int]] = []
+    results: list[EvalItem] = []
     try:
         with pdfplumber.open(io.BytesIO(pdf_bytes)) as pdf:
-            for page in pdf.pages:
-                tables = page.extract_tables() or []
-                for tb in tables:
-                    # Skip too small tables
-                    if not tb or len(tb) < 2:
-                        continue
-                    # Normalize table cells
-                    norm = [[(c or '').strip() for c in row] for row in tb]
-                    # Try to detect header row if contains 'ponderación'
-                    header_idx = 0
-                    for i in range(min(2, len(norm))):
-                        header_line = ' '.join(norm[i]).lower()
-                        if 'ponderacion' in _strip_accents(header_line) or '%' in header_line:
-                            header_idx = i
+            span = pages if pages is not None else range(len(pdf.pages))
+            keys = PAGE_CACHE.page_keys(pdf_bytes)
+            if keys is not None and len(keys) != len(pdf.pages):
+                keys = None
+            if fast_path:
+                try:
+                    texts = page_texts if page_texts is not None else pdf_page_texts(pdf_bytes)
+                    results = _extract_eval_rows_fast(pdf, _eval_candidate_pages(texts, span), span.stop, keys, budget)
+                except MemoryLimitExceeded:
+                    raise
+                except Exception:
+                    results = []
+            if not results and not (budget is not None and budget.degraded):
+                ranges = _parallel_page_ranges(pdf_bytes, span)
+                if ranges:
+                    results = _run_page_ranges(pdf_bytes, _eval_table_rows_worker, ranges)
+                else:
+                    for idx in span:
+                        page = pdf.pages[idx]
+                        key = keys[idx] if keys is not None else None
+                        for tb in _page_cached(key, "tables", lambda: page.extract_tables() or []):
+                            results.extend(_eval_rows_from_table(tb))
+                        if budget is not None and budget.check():
                             break
-                    rows = norm[header_idx+1:] if header_idx < len(norm) else norm
-                    for row in rows:
-                        if not row:
-                            continue
-                        # Find a numeric cell to use as percent
-                        pct_val = None
-                        label_parts: list[str] = []
-                        for cell in row:
-                            txt = (cell or '').strip()
-                            if not txt:
-                                continue
-                            m_pct = re.fullmatch(r"(\d{1,3})\s*%?", _strip_accents(txt))
-                            if m_pct:
-                                try:
-                                    v = int(m_pct.group(1))
-                                    if 0 <= v <= 100:
-                                        pct_val = v
-                                        continue
-                                except Exception:
-                                    pass
-                            # Non-numeric, part of label
-                            label_parts.append(txt)
-                        if pct_val is not None and label_parts:
-                            label = ' '.join(label_parts)
-                            # Collapse whitespace
-                            label = re.sub(r"\s+", " ", label)
-                            # Trim overly generic tails
-                            label = label.strip(' -:\u2013\u2014')
-                            results.append((label, pct_val))
+    except MemoryLimitExceeded:
+        raise
     except Exception:
         return []
-    # Dedup and stringify
-    seen = set()
-    out: list[str] = []
-    for label, pct in results:
-        key = (label.lower(), pct)
-        if key in seen:
-            continue
-        seen.add(key)
-        out.append(f"{label}: {pct}%")
-    return out
+    return _dedup_eval_items(results)
 
-def extract_evaluation_items_numeric_blocks(text: str) -> list[str]:
+def extract_evaluation_items_numeric_blocks(text: str) -> list[EvalItem]:
     """Fallback parser for blocky layouts where weights appear as standalone numbers
     (e.g., a 'PONDERACIÓN' column) and labels are contiguous text around them.
     Heuristic: accumulate consecutive non-numeric lines as label; when a numeric-only
@@ -527,7 +1450,7 @@ def extract_evaluation_items_numeric_blocks(text: str) -> list[str]:
     )
     search_text = section if section and section != "Not found" else text
 
-    items: list[tuple[str, int]] = []
+    items: list[EvalItem] = []
     label_buf: list[str] = []
     for raw in search_text.splitlines():
         line = (raw or '').strip()
@@ -541,7 +1464,7 @@ def extract_evaluation_items_numeric_blocks(text: str) -> list[str]:
                 if 0 <= v <= 100 and label_buf:
                     label = ' '.join(label_buf)
                     label = re.sub(r"\s+", " ", label).strip(' -:\u2013\u2014')
-                    items.append((label, v))
+                    items.append(EvalItem(label, v))
                     label_buf = []
                     continue
             except Exception:
@@ -552,21 +1475,315 @@ def extract_evaluation_items_numeric_blocks(text: str) -> list[str]:
             continue
         label_buf.append(line)
 
-    # Dedup and stringify
-    seen = set()
-    out: list[str] = []
-    for label, pct in items:
-        key = (label.lower(), pct)
-        if key in seen:
-            continue
-        seen.add(key)
-        out.append(f"{label}: {pct}%")
-    return out
+    return _dedup_eval_items(items)
+
+# ------------------------------
+# Course summary: extraction + rendering
+# ------------------------------
+class CourseSummary(NamedTuple):
+    """Everything extracted from one course syllabus; formatted only when rendered."""
+    name: str
+    dates: list[ImportantDate]
+    eval_items: list[EvalItem]
+    topics: list[str]
+    resources: str
+    contact_name: str
+    contact_email: str
+    rules: str
+    warnings: list[str]
+
+def summarize_courses(
+    nombre_curso: str,
+    contenido: bytes,
+    errores: list[str],
+    fname: str,
+    on_stage: Callable[[str], None] | None = None,
+    budget: MemoryBudget | None = None,
+    normalizer: DateNormalizer | None = None,
+) -> list[CourseSummary]:
+    """Read one uploaded PDF, split it into course units and summarize each of them.
+    `on_stage` is called with a short message before each stage; `budget` is checked at every
+    stage and, once over its soft limit, caps the pages read and skips table extraction.
+    `normalizer` fixes the reference date of the request for year-less dates.
+    """
+    stage = on_stage or (lambda _msg: None)
+    stage(f"Leyendo PDF: {fname}")
+    if budget is not None:
+        budget.check("read_pdf")
+    max_pages = budget.max_pages if budget is not None else None
+    page_texts, pdf_warnings = extract_pdf_pages(contenido, errores, fname, max_pages=max_pages)
+    if max_pages is not None and len(page_texts) >= max_pages:
+        errores.append(f"{fname}: memory soft limit reached, only the first {max_pages} pages were read")
+    units = segment_courses(nombre_curso, page_texts)
+    if len(units) > 1:
+        stage(f"{len(units)} cursos detectados en {fname}")
+    summaries = []
+    for unit in units:
+        unit_stage = stage if len(units) == 1 else (lambda msg, name=unit.name: stage(f"[{name}] {msg}"))
+        summaries.append(summarize_course(unit, contenido, page_texts, pdf_warnings, on_stage=unit_stage, budget=budget, normalizer=normalizer))
+    return summaries
+
+def summarize_course(
+    unit: CourseUnit,
+    contenido: bytes,
+    page_texts: list[str],
+    pdf_warnings: list[str],
+    on_stage: Callable[[str], None] | None = None,
+    budget: MemoryBudget | None = None,
+    normalizer: DateNormalizer | None = None,
+) -> CourseSummary:
+    """Run every extractor over one course unit (its text slice and page range of the PDF)."""
+    def stage(key: str, msg: str):
+        if on_stage is not None:
+            on_stage(msg)
+        if budget is not None:
+            budget.check(key)
+
+    texto = unit.text
+    stage("dates", "Extrayendo fechas importantes...")
+    fechas = extract_dates(texto, normalizer)
+    stage("topics", "Extrayendo temario...")
+    temas = extract_section(texto, ["temario", "contenidos", "unidades", "temas"])
+    enum_temas = extract_enumerated_syllabus(texto)
+    stage("resources", "Extrayendo recursos y bibliografía...")
+    recursos = extract_section(texto, ["bibliografía", "recursos", "lecturas", "material"])
+    stage("contact", "Extrayendo contacto docente...")
+    nombre, email = extract_contact(texto)
+    stage("rules", "Extrayendo reglamento especial...")
+    reglamento = extract_section(texto, ["reglamento", "normas", "política", "condiciones"])
+    stage("eval_tables", "Extrayendo criterios de evaluación...")
+    # Evaluation criteria (prefer table-extracted > regex > numeric blocks); pdfplumber tables
+    # are the most memory-hungry step, so a degraded request goes straight to the text fallbacks
+    eval_items = []
+    if budget is None or not budget.degraded:
+        eval_items = extract_evaluation_items_from_pdf(
+            contenido, pages=unit.pages, page_texts=page_texts or None, budget=budget,
+        )
+    if not eval_items:
+        eval_items = extract_evaluation_items(texto)
+    if not eval_items:
+        eval_items = extract_evaluation_items_numeric_blocks(texto)
+    return CourseSummary(
+        name=unit.name,
+        dates=fechas,
+        eval_items=eval_items,
+        topics=enum_temas or temas.splitlines(),
+        resources=recursos,
+        contact_name=nombre,
+        contact_email=email,
+        rules=reglamento,
+        warnings=pdf_warnings,
+    )
+
+def draw_course_summary(c, summary: CourseSummary, y: float, height: float) -> float:
+    """Draw one course block on the reportlab canvas; returns the updated y cursor."""
+    def draw_lines(lines, y):
+        c.setFont("Helvetica", 11)
+        for line in lines:
+            c.drawString(60, y, str(line)[:110])
+            y -= 14
+            if y < 80:
+                c.showPage(); y = height - 40
+        return y
+
+    def heading(text, y):
+        c.setFont("Helvetica-Bold", 12)
+        c.drawString(40, y, text)
+        return y - 18
+
+    c.setFont("Helvetica-Bold", 14)
+    c.drawString(40, y, f"Course: {summary.name}")
+    y -= 22
+    # Suppress PDF warnings output per user request; still collected internally if needed.
+    y = draw_lines(summary.dates, heading("Important dates:", y))
+    if summary.eval_items:
+        y = draw_lines(summary.eval_items, heading("Evaluation criteria:", y))
+    y = draw_lines(summary.topics, heading("Syllabus:", y))
+    y = draw_lines(summary.resources.splitlines(), heading("Resources and bibliography:", y))
+    y = heading("Instructor contact:", y)
+    c.setFont("Helvetica", 11)
+    c.drawString(60, y, f"Name: {summary.contact_name}")
+    y -= 14
+    c.drawString(60, y, f"Email: {summary.contact_email}")
+    y -= 18
+    if y < 80:
+        c.showPage(); y = height - 40
+    y = draw_lines(summary.rules.splitlines(), heading("Special rules:", y))
+    y -= 20
+    if y < 80:
+        c.showPage(); y = height - 40
+    return y
+
+# ------------------------------
+# Persistent search index (SQLite FTS5)
+# ------------------------------
+# Every summarized course is written to an on-disk index as a side effect of extraction, so
+# advisors can search topics and deadlines across processed syllabi without re-parsing PDFs.
+# Text columns go into an FTS5 table (accent-insensitive); dates go into a plain table with an
+# index on the ISO date so week/range queries are cheap. Rows are keyed by the PDF's SHA-256,
+# so re-processing the same file replaces its rows instead of duplicating them.
+INDEX_SCHEMA = """
+CREATE TABLE IF NOT EXISTS courses (
+    id INTEGER PRIMARY KEY,
+    sha256 TEXT NOT NULL,
+    filename TEXT NOT NULL,
+    course TEXT NOT NULL,
+    contact_name TEXT NOT NULL,
+    contact_email TEXT NOT NULL,
+    indexed_at TEXT NOT NULL,
+    UNIQUE (sha256, course)
+);
+CREATE VIRTUAL TABLE IF NOT EXISTS course_text USING fts5(
+    course, topics, resources, rules, evaluation,
+    tokenize = 'unicode61 remove_diacritics 2'
+);
+CREATE TABLE IF NOT EXISTS course_dates (
+    course_id INTEGER NOT NULL,
+    kind TEXT NOT NULL,
+    date TEXT NOT NULL,
+    context TEXT NOT NULL
+);
+CREATE INDEX IF NOT EXISTS course_dates_by_date ON course_dates (date, kind);
+CREATE INDEX IF NOT EXISTS course_dates_by_course ON course_dates (course_id);
+"""
+
+def _fts_query(text: str) -> str:
+    """Quote each word so user input is matched as terms (AND) instead of parsed as FTS syntax."""
+    terms = re.findall(r"\w+", text)
+    return " ".join(f'"{t}"' for t in terms)
+
+class SyllabusIndex:
+    """On-disk search index of summarized courses. Safe to share between threads of one worker;
+    several workers may point at the same file (WAL mode + busy timeout)."""
+
+    def __init__(self, path: str):
+        self.path = path
+        self._conn = None
+        self._pid = None
+        self._lock = threading.Lock()
+        self.indexed_files = 0
+        self.errors = 0
+
+    @classmethod
+    def from_env(cls) -> "SyllabusIndex | None":
+        """SYLLABUS_INDEX_PATH, the SQLite file to write. Opt-in: the index stores file names and
+        teacher contacts, so it is off unless a path is given (empty or 'off' also disable it)."""
+        path = os.getenv("SYLLABUS_INDEX_PATH", "")
+        if path.strip().lower() in {"", "off", "0", "false"}:
+            return None
+        return cls(path)
+
+    def _connection(self):
+        # Connections must not cross a fork (gunicorn preload), so open one per process on first use
+        if self._conn is None or self._pid != os.getpid():
+            conn = sqlite3.connect(self.path, timeout=10.0, check_same_thread=False)
+            conn.row_factory = sqlite3.Row
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            conn.executescript(INDEX_SCHEMA)
+            self._conn, self._pid = conn, os.getpid()
+        return self._conn
+
+    def add_file(self, filename: str, contenido: bytes, summaries: list[CourseSummary]) -> None:
+        """Replace the indexed rows of this PDF with `summaries`. Failures are logged, never raised."""
+        sha = hashlib.sha256(contenido).hexdigest()
+        now = datetime.now().isoformat(timespec="seconds")
+        try:
+            with self._lock:
+                conn = self._connection()
+                with conn:
+                    old_ids = [row[0] for row in conn.execute("SELECT id FROM courses WHERE sha256 = ?", (sha,))]
+                    for course_id in old_ids:
+                        conn.execute("DELETE FROM course_text WHERE rowid = ?", (course_id,))
+                        conn.execute("DELETE FROM course_dates WHERE course_id = ?", (course_id,))
+                    conn.execute("DELETE FROM courses WHERE sha256 = ?", (sha,))
+                    for summary in summaries:
+                        course_id = conn.execute(
+                            "INSERT INTO courses (sha256, filename, course, contact_name, contact_email, indexed_at)"
+                            " VALUES (?, ?, ?, ?, ?, ?)",
+                            (sha, filename, summary.name, summary.contact_name, summary.contact_email, now),
+                        ).lastrowid
+                        conn.execute(
+                            "INSERT INTO course_text (rowid, course, topics, resources, rules, evaluation)"
+                            " VALUES (?, ?, ?, ?, ?, ?)",
+                            (course_id, summary.name, "\n".join(summary.topics), summary.resources,
+                             summary.rules, "\n".join(str(item) for item in summary.eval_items)),
+                        )
+                        conn.executemany(
+                            "INSERT INTO course_dates (course_id, kind, date, context) VALUES (?, ?, ?, ?)",
+                            [(course_id, d.kind, d.when.date().isoformat(), d.context) for d in summary.dates],
+                        )
+            self.indexed_files += 1
+        except sqlite3.Error as e:
+            self.errors += 1
+            print(f"[ERROR] No se pudo indexar {filename}: {e}")
+
+    def search(
+        self,
+        q: str | None = None,
+        kind: str | None = None,
+        date_from: date | None = None,
+        date_to: date | None = None,
+        limit: int = 50,
+    ) -> dict:
+        """Courses whose text matches `q` (best first), and their dates in [date_from, date_to]
+        of the given kind. Dates are only listed when a date range or kind is given; courses only
+        when `q` has searchable terms (never the whole table)."""
+        match = _fts_query(q) if q else ""
+        with self._lock:
+            conn = self._connection()
+            rows = []
+            if match:
+                rows = conn.execute(
+                    "SELECT c.id, c.course, c.filename, c.contact_name, c.contact_email, c.indexed_at,"
+                    " snippet(course_text, -1, '[', ']', '…', 12) AS snippet"
+                    " FROM course_text JOIN courses c ON c.id = course_text.rowid"
+                    " WHERE course_text MATCH ? ORDER BY bm25(course_text) LIMIT ?",
+                    (match, limit),
+                ).fetchall()
+            courses = [dict(row) for row in rows]
+            result: dict = {"courses": courses}
+            if kind or date_from or date_to:
+                clauses, params = [], []
+                if match:
+                    clauses.append("d.course_id IN (SELECT rowid FROM course_text WHERE course_text MATCH ?)")
+                    params.append(match)
+                if kind:
+                    clauses.append("d.kind = ?")
+                    params.append(kind.lower())
+                if date_from:
+                    clauses.append("d.date >= ?")
+                    params.append(date_from.isoformat())
+                if date_to:
+                    clauses.append("d.date <= ?")
+                    params.append(date_to.isoformat())
+                where = " AND ".join(clauses)
+                dates = conn.execute(
+                    "SELECT d.date, d.kind, d.context, c.id AS course_id, c.course, c.filename"
+                    f" FROM course_dates d JOIN courses c ON c.id = d.course_id WHERE {where}"
+                    " ORDER BY d.date LIMIT ?",
+                    (*params, limit),
+                ).fetchall()
+                result["dates"] = [dict(row) for row in dates]
+        return result
+
+    def snapshot(self) -> dict:
+        return {"path": self.path, "indexed_files": self.indexed_files, "errors": self.errors}
 
 # ------------------------------
 # Helpers separados para syllabus y schedule
 # ------------------------------
-async def build_syllabus_pdf(files: List[UploadFile]) -> bytes:
+def _memory_abort(errores: list[str], fname: str, exc: MemoryLimitExceeded, remaining: List[UploadFile]) -> None:
+    """Record a hard memory limit abort: the file that hit it and the files left unprocessed."""
+    errores.append(f"{fname}: {exc}")
+    if remaining:
+        errores.append(f"Skipped after memory limit: {', '.join(f.filename for f in remaining)}")
+
+async def build_syllabus_pdf(
+    files: List[UploadFile], index: SyllabusIndex | None = None, budget: MemoryBudget | None = None,
+) -> bytes:
+    from reportlab.lib.pagesizes import letter
+    from reportlab.pdfgen import canvas
     buffer = io.BytesIO()
     c = canvas.Canvas(buffer, pagesize=letter)
     width, height = letter
@@ -576,94 +1793,24 @@ async def build_syllabus_pdf(files: List[UploadFile]) -> bytes:
     y -= 30
     c.setFont("Helvetica", 12)
     errores: list[str] = []
+    normalizer = DateNormalizer()
     try:
         for idx, file in enumerate(files):
             try:
                 nombre_curso = file.filename.rsplit('.', 1)[0]
                 contenido = await file.read()
-                texto, pdf_warnings = extract_pdf_text(contenido, errores, file.filename)
-                fechas = extract_dates(texto)
-                temas = extract_section(texto, ["temario", "contenidos", "unidades", "temas"])
-                enum_temas = extract_enumerated_syllabus(texto)
-                recursos = extract_section(texto, ["bibliografía", "recursos", "lecturas", "material"])
-                nombre, email = extract_contact(texto)
-                reglamento = extract_section(texto, ["reglamento", "normas", "política", "condiciones"])
-                c.setFont("Helvetica-Bold", 14)
-                c.drawString(40, y, f"Course: {nombre_curso}")
-                y -= 22
-                # Suppress PDF warnings output per user request; still collected internally if needed.
-                c.setFont("Helvetica-Bold", 12)
-                c.drawString(40, y, "Important dates:")
-                y -= 18
-                c.setFont("Helvetica", 11)
-                for f in fechas:
-                    c.drawString(60, y, f[:110])
-                    y -= 14
-                    if y < 80:
-                        c.showPage(); y = height - 40
-                # Evaluation criteria (prefer table-extracted > regex > numeric blocks)
-                eval_items = extract_evaluation_items_from_pdf(contenido)
-                if not eval_items:
-                    eval_items = extract_evaluation_items(texto)
-                if not eval_items:
-                    eval_items = extract_evaluation_items_numeric_blocks(texto)
-                if eval_items:
-                    c.setFont("Helvetica-Bold", 12)
-                    c.drawString(40, y, "Evaluation criteria:")
-                    y -= 18
-                    c.setFont("Helvetica", 11)
-                    for item in eval_items:
-                        c.drawString(60, y, item[:110])
-                        y -= 14
-                        if y < 80:
-                            c.showPage(); y = height - 40
-                c.setFont("Helvetica-Bold", 12)
-                c.drawString(40, y, "Syllabus:")
-                y -= 18
-                c.setFont("Helvetica", 11)
-                if enum_temas:
-                    for line in enum_temas:
-                        c.drawString(60, y, line[:110])
-                        y -= 14
-                        if y < 80:
-                            c.showPage(); y = height - 40
-                else:
-                    for line in temas.splitlines():
-                        c.drawString(60, y, line[:110])
-                        y -= 14
-                        if y < 80:
-                            c.showPage(); y = height - 40
-                c.setFont("Helvetica-Bold", 12)
-                c.drawString(40, y, "Resources and bibliography:")
-                y -= 18
-                c.setFont("Helvetica", 11)
-                for line in recursos.splitlines():
-                    c.drawString(60, y, line[:110])
-                    y -= 14
-                    if y < 80:
-                        c.showPage(); y = height - 40
-                c.setFont("Helvetica-Bold", 12)
-                c.drawString(40, y, "Instructor contact:")
-                y -= 18
-                c.setFont("Helvetica", 11)
-                c.drawString(60, y, f"Name: {nombre}")
-                y -= 14
-                c.drawString(60, y, f"Email: {email}")
-                y -= 18
-                if y < 80:
-                    c.showPage(); y = height - 40
-                c.setFont("Helvetica-Bold", 12)
-                c.drawString(40, y, "Special rules:")
-                y -= 18
-                c.setFont("Helvetica", 11)
-                for line in reglamento.splitlines():
-                    c.drawString(60, y, line[:110])
-                    y -= 14
-                    if y < 80:
-                        c.showPage(); y = height - 40
-                y -= 20
-                if y < 80:
-                    c.showPage(); y = height - 40
+                summaries = await asyncio.to_thread(
+                    summarize_courses, nombre_curso, contenido, errores, file.filename, None, budget, normalizer,
+                )
+                if index is not None and (budget is None or budget.complete):
+                    await asyncio.to_thread(index.add_file, file.filename, contenido, summaries)
+                if budget is not None:
+                    budget.check("render")
+                for summary in summaries:
+                    y = draw_course_summary(c, summary, y, height)
+            except MemoryLimitExceeded as e:
+                _memory_abort(errores, file.filename, e, files[idx + 1:])
+                break
             except Exception as e:
                 errores.append(f"{file.filename}: {e}")
         if errores:
@@ -691,11 +1838,18 @@ def _parse_semester_start(s: str | None):
         return None
 
 async def build_schedule_ics(files: List[UploadFile], semester_start: str | None = None) -> bytes | None:
+    """Read the uploads, then parse them in a worker thread so the event loop stays responsive."""
+    uploads = [(file.filename, await file.read()) for file in files]
+    return await asyncio.to_thread(schedule_ics_from_pdfs, uploads, semester_start)
+
+def schedule_ics_from_pdfs(uploads: list[tuple[str, bytes]], semester_start: str | None = None) -> bytes | None:
     # Este endpoint asume que los archivos enviados corresponden a horarios.
     # Procesamos todos los PDF recibidos para mayor tolerancia.
-    all_slots = []
-    for file in files:
-        contenido = await file.read()
+    from ics import Calendar, Event
+    from ics.grammar.parse import ContentLine
+    pdfplumber = _load_pdfplumber()
+    store = SlotStore()
+    for fname, contenido in uploads:
         # Sanitize before positional/table extraction attempts
         contenido = sanitize_pdf_header(contenido)
         # 1) Intento posicional con pdfplumber si está disponible
@@ -723,13 +1877,12 @@ async def build_schedule_ics(files: List[UploadFile], semester_start: str | None
                                 key = round(top / 2)  # buckets más finos
                                 buckets.setdefault(key, []).append(w)
                             # 2) En cada bucket, detectar rangos de tiempo y su banda vertical
-                            time_re = re.compile(rf"(?P<start>{TIME_TOKEN})\s*(?:-|–|—|a|to)\s*(?P<end>{TIME_TOKEN})", re.IGNORECASE)
+                            time_re = TIME_RANGE_PATTERN
                             for _, wlist in buckets.items():
                                 wlist.sort(key=lambda w: w.get('x0', 0))
                                 line_text = ' '.join((w.get('text') or '') for w in wlist)
                                 for tm in time_re.finditer(line_text):
-                                    start = _parse_time_24(tm.group('start'))
-                                    end = _parse_time_24(tm.group('end'))
+                                    slot_times = (_parse_time_minutes(tm.group('start')), _parse_time_minutes(tm.group('end')))
                                     # Calcular centro vertical de la fila usando palabras numéricas
                                     numeric_words = [w for w in wlist if re.search(r"\d", (w.get('text') or ''))]
                                     if not numeric_words:
@@ -749,37 +1902,35 @@ async def build_schedule_ics(files: List[UploadFile], semester_start: str | None
                                             low = _strip_accents(txt.lower())
                                             if low in DAY_NAMES:
                                                 continue
-                                            if re.fullmatch(TIME_TOKEN, low):
+                                            if TIME_TOKEN_RE.fullmatch(low):
                                                 continue
                                             if abs(wx - col_x) <= 60 and abs(wy - y_center) <= 8:
                                                 candidates.append(txt)
                                         if candidates:
-                                            all_slots.append((weekday, start, end))
+                                            store.add(Slot(weekday, *slot_times), (fname, "positional"), _course_key(" ".join(candidates)))
                 used_positional = True
             except Exception:
                 used_positional = False
-        # 2) Fallback por texto si no se pudo usar posicional o si no produjo slots
-        if not used_positional or not all_slots:
+        # 2) Fallback por texto si no se pudo usar posicional o si no produjo slots para este archivo
+        if not used_positional or not store.count_for(fname):
             try:
-                reader = PdfReader(io.BytesIO(contenido))
-                texto = "\n".join(page.extract_text() or '' for page in reader.pages)
+                texto = "\n".join(pdf_page_texts(contenido))
             except Exception:
                 texto = ""
             if texto:
-                slots = extract_schedule(texto)
-                all_slots.extend(slots)
-    if not all_slots:
+                for slot, course in extract_schedule_courses(texto):
+                    store.add(slot, (fname, "text"), course)
+    if not len(store):
         return None
     cal = Calendar()
     # Anchor to semester_start if provided; else use next weekday from today
     anchor_date = _parse_semester_start(semester_start)
     today = datetime.today()
-    for (weekday, start, end) in all_slots:
+    for (course, slot, sources) in store.slots():
+        weekday = slot.weekday
         # Skip weekends by default to avoid false positives (enable if you truly have weekend classes)
         if weekday >= 5:
             continue
-        start_time = datetime.strptime(start, "%H:%M")
-        end_time = datetime.strptime(end, "%H:%M")
         if anchor_date is not None:
             # find the date in the anchor week that matches this weekday
             # compute Monday of anchor week
@@ -791,47 +1942,218 @@ async def build_schedule_ics(files: List[UploadFile], semester_start: str | None
             first_date = datetime.combine(first_date, datetime.min.time())
         else:
             first_date = next_weekday(today, weekday)
-        # Crear 15 ocurrencias semanales
-        for wk in range(15):
-            occ_start = first_date + timedelta(days=7 * wk)
-            event_start = occ_start.replace(hour=start_time.hour, minute=start_time.minute, second=0, microsecond=0)
-            event_end = occ_start.replace(hour=end_time.hour, minute=end_time.minute, second=0, microsecond=0)
-            event = Event()
-            event.name = "Class Session"
-            # Keep naive datetimes (no 'Z' UTC) to avoid timezone shifts on import
-            event.begin = event_start
-            event.end = event_end
-            event.uid = str(uuid.uuid4())
-            event.description = "Imported from schedule PDF."
-            cal.events.add(event)
+        # Un evento semanal con RRULE (15 ocurrencias) en lugar de 15 eventos sueltos
+        event_start = first_date.replace(hour=slot.start // 60, minute=slot.start % 60, second=0, microsecond=0)
+        event_end = first_date.replace(hour=slot.end // 60, minute=slot.end % 60, second=0, microsecond=0)
+        event = Event()
+        event.name = "Class Session"
+        # Keep naive datetimes (no 'Z' UTC) to avoid timezone shifts on import
+        event.begin = event_start
+        event.end = event_end
+        # Deterministic UID: same slot and start week -> same event on re-import
+        event.uid = str(uuid.uuid5(uuid.NAMESPACE_URL, f"syllabus-unifier/{course}/{weekday}/{slot.start}/{slot.end}/{event_start.date()}"))
+        source_files = sorted({fname for fname, _ in sources})
+        event.description = f"Imported from schedule PDF ({', '.join(source_files)})."
+        event.extra.append(ContentLine(name="RRULE", value="FREQ=WEEKLY;COUNT=15"))
+        cal.events.add(event)
     return str(cal).encode("utf-8")
 
 # ------------------------------
-# Endpoints separados
+# Artifact cache (ETag / If-None-Match)
 # ------------------------------
-@app.post("/syllabus")
-async def endpoint_syllabus(files: List[UploadFile] = File(...)):
-    pdf_bytes = await build_syllabus_pdf(files)
-    return Response(content=pdf_bytes, media_type="application/pdf", headers={
-        "Content-Disposition": "attachment; filename=syllabus_unificado.pdf"
+# Browser max-age for GET /artifacts/{etag}; the content behind an ETag never changes
+ARTIFACT_MAX_AGE = int(_env_float("SYLLABUS_ARTIFACT_MAX_AGE", 86400))
+
+class ArtifactCache:
+    """LRU store of rendered artifacts keyed by ETag, bounded by entry count and total bytes."""
+
+    def __init__(self, max_entries: int, max_bytes: int):
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self._items: OrderedDict[str, tuple[bytes, str, str]] = OrderedDict()
+        self._bytes = 0
+        self.hits = 0
+        self.misses = 0
+        self.not_modified = 0
+        self.precondition_failed = 0
+
+    @classmethod
+    def from_env(cls) -> "ArtifactCache":
+        """SYLLABUS_ARTIFACT_CACHE_ENTRIES (default 128) and SYLLABUS_ARTIFACT_CACHE_MB (default 64)."""
+        return cls(
+            max_entries=int(_env_float("SYLLABUS_ARTIFACT_CACHE_ENTRIES", 128)),
+            max_bytes=int(_env_float("SYLLABUS_ARTIFACT_CACHE_MB", 64) * 1024 * 1024),
+        )
+
+    def get(self, etag: str) -> tuple[bytes, str, str] | None:
+        item = self._items.get(etag)
+        if item is None:
+            self.misses += 1
+            return None
+        self._items.move_to_end(etag)
+        self.hits += 1
+        return item
+
+    def put(self, etag: str, content: bytes, media_type: str, filename: str) -> bool:
+        """Store an artifact; False when the cache is disabled or the artifact exceeds its byte limit."""
+        if self.max_entries <= 0 or len(content) > self.max_bytes:
+            return False
+        old = self._items.pop(etag, None)
+        if old is not None:
+            self._bytes -= len(old[0])
+        self._items[etag] = (content, media_type, filename)
+        self._bytes += len(content)
+        while self._items and (len(self._items) > self.max_entries or self._bytes > self.max_bytes):
+            _, (evicted, _, _) = self._items.popitem(last=False)
+            self._bytes -= len(evicted)
+        return True
+
+    def snapshot(self) -> dict:
+        return {
+            "entries": len(self._items),
+            "bytes": self._bytes,
+            "hits": self.hits,
+            "misses": self.misses,
+            "not_modified": self.not_modified,
+            "precondition_failed": self.precondition_failed,
+        }
+
+async def uploads_etag(kind: str, files: List[UploadFile], **params) -> str:
+    """ETag derived from the endpoint, its parameters and the name + SHA-256 of every upload.
+    Files are rewound afterwards so the builders can read them again.
+    """
+    h = hashlib.sha256(kind.encode())
+    for key in sorted(params):
+        h.update(f"\0{key}={params[key]}".encode())
+    for file in files:
+        contenido = await file.read()
+        await file.seek(0)
+        h.update(f"\0{file.filename}\0".encode())
+        h.update(hashlib.sha256(contenido).digest())
+    return f'"{h.hexdigest()[:32]}"'
+
+def _etag_matches(request: Request, etag: str) -> bool:
+    header = request.headers.get("if-none-match")
+    if not header:
+        return False
+    candidates = {tag.strip().removeprefix("W/") for tag in header.split(",")}
+    return "*" in candidates or etag in candidates
+
+def _artifact_url(etag: str) -> str:
+    return "/artifacts/" + etag.strip('"')
+
+def _artifact_response(content: bytes, media_type: str, filename: str, etag: str | None,
+                       cache_control: str = "private, no-cache") -> Response:
+    """Artifact download; `etag` None marks a result that is not in the artifact cache (partial,
+    or refused by the cache) and must not be revalidated or fetched again by ETag."""
+    if etag is None:
+        return Response(content=content, media_type=media_type, headers={
+            "Content-Disposition": f"attachment; filename={filename}",
+            "Cache-Control": "no-store",
+        })
+    return Response(content=content, media_type=media_type, headers={
+        "Content-Disposition": f"attachment; filename={filename}",
+        "ETag": etag,
+        "Content-Location": _artifact_url(etag),
+        "Cache-Control": cache_control,
     })
 
-@app.post("/schedule")
-async def endpoint_schedule(files: List[UploadFile] = File(...), semester_start: str | None = Form(None)):
-    ics_bytes = await build_schedule_ics(files, semester_start=semester_start)
+def cached_artifact(request: Request, etag: str) -> Response | None:
+    """412 if the client sent a matching If-None-Match (RFC 9110 §13.1.2: a false condition on
+    a method other than GET/HEAD is a failed precondition, not 304), the stored artifact if we
+    rendered it before, else None. Clients that want browser caching GET /artifacts/{etag}."""
+    cache: ArtifactCache = request.app.state.artifact_cache
+    if _etag_matches(request, etag):
+        cache.precondition_failed += 1
+        return Response(status_code=412, headers={"ETag": etag, "Content-Location": _artifact_url(etag)})
+    item = cache.get(etag)
+    if item is None:
+        return None
+    return _artifact_response(*item, etag)
+
+def store_artifact(
+    request: Request, etag: str, content: bytes, media_type: str, filename: str, budget: MemoryBudget | None = None,
+) -> Response:
+    """Cache the artifact under `etag` and return it; results of degraded or aborted requests
+    (see MemoryBudget.complete) are returned without being cached or tagged, as are artifacts
+    the cache refuses (no /artifacts URL would serve them)."""
+    if budget is not None and not budget.complete:
+        return _artifact_response(content, media_type, filename, None)
+    if not request.app.state.artifact_cache.put(etag, content, media_type, filename):
+        return _artifact_response(content, media_type, filename, None)
+    return _artifact_response(content, media_type, filename, etag)
+
+def _schedule_anchor_param(semester_start: str | None) -> str:
+    # Without semester_start the calendar is anchored to today, so the ETag must change daily
+    return semester_start or f"today:{date.today().isoformat()}"
+
+# ------------------------------
+# Endpoints separados
+# ------------------------------
+@router.post("/syllabus")
+async def endpoint_syllabus(request: Request, files: List[UploadFile] = File(...)):
+    etag = await uploads_etag("syllabus", files)
+    cached = cached_artifact(request, etag)
+    if cached is not None:
+        return cached
+    async with parse_slot(request):
+        with request.app.state.memory.track() as budget:
+            pdf_bytes = await build_syllabus_pdf(files, index=request.app.state.syllabus_index, budget=budget)
+    return store_artifact(request, etag, pdf_bytes, "application/pdf", "syllabus_unificado.pdf", budget)
+
+@router.post("/schedule")
+async def endpoint_schedule(request: Request, files: List[UploadFile] = File(...), semester_start: str | None = Form(None)):
+    etag = await uploads_etag("schedule", files, semester_start=_schedule_anchor_param(semester_start))
+    cached = cached_artifact(request, etag)
+    if cached is not None:
+        return cached
+    async with parse_slot(request):
+        ics_bytes = await build_schedule_ics(files, semester_start=semester_start)
     if not ics_bytes:
         from fastapi.responses import JSONResponse
         return JSONResponse(status_code=422, content={"detail": "No schedule found in uploaded files."})
-    return Response(content=ics_bytes, media_type="text/calendar", headers={
-        "Content-Disposition": "attachment; filename=class_schedule.ics"
-    })
+    return store_artifact(request, etag, ics_bytes, "text/calendar", "class_schedule.ics")
+
+@router.post("/generar")
+async def generar_pdf(request: Request, files: List[UploadFile] = File(...), semester_start: str | None = Form(None)):
+    etag = await uploads_etag("generar", files, semester_start=_schedule_anchor_param(semester_start))
+    cached = cached_artifact(request, etag)
+    if cached is not None:
+        print("[LOG] Respuesta servida desde caché (ETag).")
+        return cached
+    async with parse_slot(request):
+        with request.app.state.memory.track() as budget:
+            artifact = await build_generar_artifact(files, semester_start, index=request.app.state.syllabus_index, budget=budget)
+    if artifact is None:
+        return Response(content=b"No syllabus or schedule found.", media_type="text/plain")
+    return store_artifact(request, etag, *artifact, budget)
+
+def _summary_to_dict(summary: CourseSummary) -> dict:
+    data = summary._asdict()
+    data["eval_items"] = [item._asdict() for item in summary.eval_items]
+    data["dates"] = [{**d._asdict(), "when": d.when.isoformat()} for d in summary.dates]
+    return data
+
+async def build_generar_artifact(
+    files: List[UploadFile],
+    semester_start: str | None = None,
+    progress: "JobProgress | None" = None,
+    index: SyllabusIndex | None = None,
+    budget: MemoryBudget | None = None,
+) -> tuple[bytes, str, str] | None:
+    """Build the /generar response body: (content, media_type, filename), or None if nothing was found.
+    Syllabus files are extracted in a worker thread so the event loop stays responsive; when
+    `progress` is given, stage transitions and each file's extraction result are published to it.
+    Extracted courses are also written to `index` when one is given, and `budget` tracks the
+    request's memory (degrading past its soft limit, stopping past its hard limit).
+    """
+    def publish(event: str, data: dict):
+        if progress is not None:
+            progress.publish_threadsafe(event, data)
 
-@app.post("/generar")
-async def generar_pdf(files: List[UploadFile] = File(...), semester_start: str | None = Form(None)):
     print("[LOG] Iniciando procesamiento de archivos...")
-    from fastapi.responses import StreamingResponse
-    import tempfile
-    import os
+    from reportlab.lib.pagesizes import letter
+    from reportlab.pdfgen import canvas
     buffer = io.BytesIO()
     c = canvas.Canvas(buffer, pagesize=letter)
     width, height = letter
@@ -850,17 +2172,28 @@ async def generar_pdf(files: List[UploadFile] = File(...), semester_start: str |
             schedule_files.append(file)
         else:
             syllabus_files.append(file)
+    publish("files", {
+        "schedule": [f.filename for f in schedule_files],
+        "syllabus": [f.filename for f in syllabus_files],
+    })
     # Generar ICS con la misma lógica robusta que el endpoint /schedule
     ics_bytes = None
     if schedule_files:
+        publish("stage", {"file": None, "stage": "Generando calendario de horarios..."})
         try:
+            if budget is not None:
+                budget.check("ics")
             ics_bytes = await build_schedule_ics(schedule_files, semester_start=semester_start)
+            publish("schedule", {"files": [f.filename for f in schedule_files], "found": bool(ics_bytes)})
         except Exception as e:
             tb = traceback.format_exc()
             print(f"[ERROR] Falló la generación de ICS (combinado): {e}\n{tb}")
             errores.append(f"ICS: {e}")
+            publish("file_error", {"file": None, "error": f"ICS: {e}"})
     # Procesar archivos de syllabus para el PDF resumen
     pdf_bytes = None
+    # Year-less dates resolve against the semester start when given, else against today
+    normalizer = DateNormalizer(_parse_semester_start(semester_start))
     if syllabus_files:
         try:
             for idx, file in enumerate(syllabus_files):
@@ -868,101 +2201,38 @@ async def generar_pdf(files: List[UploadFile] = File(...), semester_start: str |
                     print(f"[LOG] Procesando archivo {idx+1}/{len(syllabus_files)}: {file.filename}")
                     nombre_curso = file.filename.rsplit('.', 1)[0]
                     contenido = await file.read()
-                    print(f"[LOG] Leyendo PDF: {file.filename}")
-                    texto, pdf_warnings = extract_pdf_text(contenido, errores, file.filename)
-                    print(f"[LOG] Extrayendo fechas importantes...")
-                    fechas = extract_dates(texto)
-                    print(f"[LOG] Extrayendo temario...")
-                    temas = extract_section(texto, ["temario", "contenidos", "unidades", "temas"])
-                    enum_temas = extract_enumerated_syllabus(texto)
-                    print(f"[LOG] Extrayendo recursos y bibliografía...")
-                    recursos = extract_section(texto, ["bibliografía", "recursos", "lecturas", "material"])
-                    print(f"[LOG] Extrayendo contacto docente...")
-                    nombre, email = extract_contact(texto)
-                    print(f"[LOG] Extrayendo reglamento especial...")
-                    reglamento = extract_section(texto, ["reglamento", "normas", "política", "condiciones"])
+
+                    def on_stage(msg, fname=file.filename):
+                        print(f"[LOG] {msg}")
+                        publish("stage", {"file": fname, "stage": msg})
+
+                    summaries = await asyncio.to_thread(
+                        summarize_courses, nombre_curso, contenido, errores, file.filename, on_stage, budget, normalizer,
+                    )
+                    if index is not None and (budget is None or budget.complete):
+                        await asyncio.to_thread(index.add_file, file.filename, contenido, summaries)
+                    publish("file_result", {
+                        "file": file.filename,
+                        "index": idx,
+                        "total": len(syllabus_files),
+                        "courses": [_summary_to_dict(s) for s in summaries],
+                    })
                     print(f"[LOG] Generando PDF para {nombre_curso}")
-                    c.setFont("Helvetica-Bold", 14)
-                    c.drawString(40, y, f"Course: {nombre_curso}")
-                    y -= 22
-                    # Suppress PDF warnings output per user request.
-                    c.setFont("Helvetica-Bold", 12)
-                    c.drawString(40, y, "Important dates:")
-                    y -= 18
-                    c.setFont("Helvetica", 11)
-                    for f in fechas:
-                        c.drawString(60, y, f[:110])
-                        y -= 14
-                        if y < 80:
-                            c.showPage(); y = height - 40
-                    # Evaluation criteria (prefer table-extracted > regex > numeric blocks)
-                    eval_items = extract_evaluation_items_from_pdf(contenido)
-                    if not eval_items:
-                        eval_items = extract_evaluation_items(texto)
-                    if not eval_items:
-                        eval_items = extract_evaluation_items_numeric_blocks(texto)
-                    if eval_items:
-                        c.setFont("Helvetica-Bold", 12)
-                        c.drawString(40, y, "Evaluation criteria:")
-                        y -= 18
-                        c.setFont("Helvetica", 11)
-                        for item in eval_items:
-                            c.drawString(60, y, item[:110])
-                            y -= 14
-                            if y < 80:
-                                c.showPage(); y = height - 40
-                    c.setFont("Helvetica-Bold", 12)
-                    c.drawString(40, y, "Syllabus:")
-                    y -= 18
-                    c.setFont("Helvetica", 11)
-                    if enum_temas:
-                        for line in enum_temas:
-                            c.drawString(60, y, line[:110])
-                            y -= 14
-                            if y < 80:
-                                c.showPage(); y = height - 40
-                    else:
-                        for line in temas.splitlines():
-                            c.drawString(60, y, line[:110])
-                            y -= 14
-                            if y < 80:
-                                c.showPage(); y = height - 40
-                    c.setFont("Helvetica-Bold", 12)
-                    c.drawString(40, y, "Resources and bibliography:")
-                    y -= 18
-                    c.setFont("Helvetica", 11)
-                    for line in recursos.splitlines():
-                        c.drawString(60, y, line[:110])
-                        y -= 14
-                        if y < 80:
-                            c.showPage(); y = height - 40
-                    c.setFont("Helvetica-Bold", 12)
-                    c.drawString(40, y, "Instructor contact:")
-                    y -= 18
-                    c.setFont("Helvetica", 11)
-                    c.drawString(60, y, f"Name: {nombre}")
-                    y -= 14
-                    c.drawString(60, y, f"Email: {email}")
-                    y -= 18
-                    if y < 80:
-                        c.showPage(); y = height - 40
-                    c.setFont("Helvetica-Bold", 12)
-                    c.drawString(40, y, "Special rules:")
-                    y -= 18
-                    c.setFont("Helvetica", 11)
-                    for line in reglamento.splitlines():
-                        c.drawString(60, y, line[:110])
-                        y -= 14
-                        if y < 80:
-                            c.showPage(); y = height - 40
-                    y -= 20
-                    if y < 80:
-                        c.showPage(); y = height - 40
+                    if budget is not None:
+                        budget.check("render")
+                    for summary in summaries:
+                        y = draw_course_summary(c, summary, y, height)
                     print(f"[LOG] PDF generado para {nombre_curso}")
+                except MemoryLimitExceeded as e:
+                    print(f"[ERROR] Límite de memoria en {file.filename}: {e}")
+                    _memory_abort(errores, file.filename, e, syllabus_files[idx + 1:])
+                    publish("file_error", {"file": file.filename, "error": str(e)})
+                    break
                 except Exception as e:
                     tb = traceback.format_exc()
                     print(f"[ERROR] Falló el procesamiento de {file.filename}: {e}\n{tb}")
                     errores.append(f"{file.filename}: {e}")
+                    publish("file_error", {"file": file.filename, "error": str(e)})
             if errores:
                 c.showPage()
                 c.setFont("Helvetica-Bold", 14)
@@ -981,12 +2251,12 @@ async def generar_pdf(files: List[UploadFile] = File(...), semester_start: str |
             c.drawString(40, y, "An unexpected error occurred during processing.")
         finally:
             c.save()
-            buffer.seek(0)
             print("[LOG] Final PDF generated and ready to send to frontend.")
-            pdf_bytes = buffer.read()
+            # Release the canvas buffer right away instead of holding it next to the ZIP copy
+            pdf_bytes = buffer.getvalue()
+            buffer.close()
     # ics_bytes ya contiene el calendario si había archivos de horario
     # Responder un único archivo simple para facilitar al frontend
-    from fastapi.responses import Response
     if pdf_bytes and ics_bytes:
         # Crear ZIP con ambos
         import zipfile
@@ -994,16 +2264,313 @@ async def generar_pdf(files: List[UploadFile] = File(...), semester_start: str |
         with zipfile.ZipFile(zip_buffer, 'w', zipfile.ZIP_DEFLATED) as zf:
             zf.writestr('syllabus_unificado.pdf', pdf_bytes)
             zf.writestr('class_schedule.ics', ics_bytes)
-        zip_buffer.seek(0)
-        return Response(content=zip_buffer.read(), media_type="application/zip", headers={
-            "Content-Disposition": "attachment; filename=syllabus_and_schedule.zip"
-        })
+        del pdf_bytes
+        return zip_buffer.getvalue(), "application/zip", "syllabus_and_schedule.zip"
     if pdf_bytes and not ics_bytes:
-        return Response(content=pdf_bytes, media_type="application/pdf", headers={
-            "Content-Disposition": "attachment; filename=syllabus_unificado.pdf"
-        })
+        return pdf_bytes, "application/pdf", "syllabus_unificado.pdf"
     if ics_bytes and not pdf_bytes:
-        return Response(content=ics_bytes, media_type="text/calendar", headers={
-            "Content-Disposition": "attachment; filename=class_schedule.ics"
-        })
-    return Response(content=b"No syllabus or schedule found.", media_type="text/plain")
+        return ics_bytes, "text/calendar", "class_schedule.ics"
+    return None
+
+def search_auth(request: Request) -> None:
+    """Require `Authorization: Bearer <SYLLABUS_SEARCH_TOKEN>` on /search when a token is configured."""
+    token = request.app.state.search_token
+    if not token:
+        return
+    scheme, _, given = request.headers.get("authorization", "").partition(" ")
+    if scheme.lower() != "bearer" or not hmac.compare_digest(given.strip().encode(), token.encode()):
+        raise HTTPException(status_code=401, detail="Search requires a bearer token.", headers={"WWW-Authenticate": "Bearer"})
+
+@router.get("/search", dependencies=[Depends(rate_limit), Depends(search_auth)])
+async def search_index(
+    request: Request,
+    q: str | None = None,
+    kind: str | None = None,
+    date_from: str | None = None,
+    date_to: str | None = None,
+    week: int | None = None,
+    semester_start: str | None = None,
+    limit: int = 50,
+):
+    """Search processed syllabi without re-parsing them.
+    `q` matches topics, resources, rules, evaluation and course names (accent-insensitive);
+    `kind` (examen, entrega, ...), `date_from`/`date_to` (YYYY-MM-DD) or `week` + `semester_start`
+    (week 1 starts on semester_start) list the matching dates too.
+    """
+    index: SyllabusIndex | None = request.app.state.syllabus_index
+    if index is None:
+        raise HTTPException(status_code=404, detail="Search index is disabled.")
+    if not (q and q.strip()) and not kind and not (date_from or date_to or week is not None):
+        raise HTTPException(status_code=400, detail="Give q, kind, a date range or week.")
+    start, end = _parse_semester_start(date_from), _parse_semester_start(date_to)
+    if (date_from and start is None) or (date_to and end is None):
+        raise HTTPException(status_code=400, detail="Dates must be YYYY-MM-DD.")
+    if week is not None:
+        anchor = _parse_semester_start(semester_start)
+        if anchor is None or week < 1:
+            raise HTTPException(status_code=400, detail="week requires semester_start (YYYY-MM-DD) and must be >= 1.")
+        start = anchor + timedelta(weeks=week - 1)
+        end = start + timedelta(days=6)
+    return await asyncio.to_thread(index.search, q, kind, start, end, max(1, min(limit, 500)))
+
+# ------------------------------
+# Background jobs with server-sent progress events
+# ------------------------------
+class JobProgress:
+    """Event log of one /jobs/generar job. Events are kept so late subscribers get the full history."""
+
+    def __init__(self, job_id: str, etag: str):
+        self.job_id = job_id
+        self.etag = etag
+        self.task: asyncio.Task | None = None
+        self.events: list[tuple[str, dict]] = []
+        self.finished = False
+        # ArtifactCache key of the result; the bytes themselves live in the byte-bounded cache
+        self.result_key: str | None = None
+        # Held by the job only when the cache refused it, until fetched once (see JobRegistry.hold)
+        self.result: tuple[bytes, str, str] | None = None
+        self.finished_at: float | None = None
+        self._loop = asyncio.get_running_loop()
+        self._changed = asyncio.Event()
+
+    def publish(self, event: str, data: dict) -> None:
+        self.events.append((event, data))
+        changed, self._changed = self._changed, asyncio.Event()
+        changed.set()
+
+    def publish_threadsafe(self, event: str, data: dict) -> None:
+        """Publish from the event loop or from a worker thread."""
+        try:
+            running = asyncio.get_running_loop()
+        except RuntimeError:
+            running = None
+        if running is self._loop:
+            self.publish(event, data)
+        else:
+            self._loop.call_soon_threadsafe(self.publish, event, data)
+
+    def finish(self, event: str, data: dict, result_key: str | None = None) -> None:
+        self.result_key = result_key
+        self.finished = True
+        self.finished_at = time.monotonic()
+        self.publish(event, data)
+
+    async def stream(self, heartbeat: float = 15.0):
+        """Yield SSE frames: the history first, then new events until the job finishes."""
+        sent = 0
+        while True:
+            changed = self._changed
+            while sent < len(self.events):
+                event, data = self.events[sent]
+                sent += 1
+                yield f"event: {event}\ndata: {json.dumps(data, default=str, ensure_ascii=False)}\n\n"
+            if self.finished:
+                return
+            try:
+                await asyncio.wait_for(changed.wait(), timeout=heartbeat)
+            except asyncio.TimeoutError:
+                # Comment frame keeps proxies from closing an idle connection
+                yield ": keep-alive\n\n"
+
+class JobRegistry:
+    """Jobs of this worker. Finished jobs are kept for `ttl` seconds, and the oldest finished ones are
+    dropped beyond `max_jobs`; running jobs are never evicted (admission control bounds them).
+    Results live in the app's ArtifactCache under `JobProgress.result_key`. Only artifacts the
+    cache refuses (cache disabled or artifact over its byte limit) are held by the job itself,
+    up to `max_result_bytes` across all jobs.
+    """
+
+    def __init__(self, max_jobs: int = 256, ttl: float = 900.0, max_result_bytes: int = 64 * 1024 * 1024):
+        self.max_jobs = max_jobs
+        self.ttl = ttl
+        self.max_result_bytes = max_result_bytes
+        self._jobs: OrderedDict[str, JobProgress] = OrderedDict()
+
+    @classmethod
+    def from_env(cls) -> "JobRegistry":
+        """SYLLABUS_JOB_RESULTS_MB (default 64): results held by jobs when the artifact cache refuses them."""
+        return cls(max_result_bytes=int(_env_float("SYLLABUS_JOB_RESULTS_MB", 64) * 1024 * 1024))
+
+    def create(self, etag: str) -> JobProgress:
+        self._expire()
+        job = JobProgress(uuid.uuid4().hex, etag)
+        self._jobs[job.job_id] = job
+        return job
+
+    def get(self, job_id: str) -> JobProgress | None:
+        return self._jobs.get(job_id)
+
+    def hold(self, job: JobProgress, artifact: tuple[bytes, str, str]) -> bool:
+        """Keep `artifact` on the job until it is fetched or the job expires; False when over budget."""
+        self._expire()
+        held = sum(len(other.result[0]) for other in self._jobs.values() if other.result is not None)
+        if held + len(artifact[0]) > self.max_result_bytes:
+            return False
+        job.result = artifact
+        return True
+
+    def _expire(self) -> None:
+        now = time.monotonic()
+        for job_id, job in list(self._jobs.items()):
+            if job.finished and now - job.finished_at > self.ttl:
+                del self._jobs[job_id]
+        excess = len(self._jobs) - self.max_jobs + 1
+        if excess > 0:
+            for job_id in [job_id for job_id, job in self._jobs.items() if job.finished][:excess]:
+                del self._jobs[job_id]
+
+    def snapshot(self) -> dict:
+        return {
+            "tracked": len(self._jobs),
+            "running": sum(1 for job in self._jobs.values() if not job.finished),
+            "held_result_bytes": sum(len(job.result[0]) for job in self._jobs.values() if job.result is not None),
+        }
+
+async def _run_generar_job(app: FastAPI, job: JobProgress, files: List[UploadFile], semester_start: str | None, etag: str):
+    result_url = f"/jobs/{job.job_id}/result"
+    try:
+        item = app.state.artifact_cache.get(etag)
+        if item is not None:
+            job.finish("done", {"result_url": result_url, "media_type": item[1], "filename": item[2], "etag": etag}, etag)
+            return
+        async with app.state.admission.slot():
+            with app.state.memory.track() as budget:
+                artifact = await build_generar_artifact(
+                    files, semester_start, progress=job, index=app.state.syllabus_index, budget=budget,
+                )
+        if artifact is None:
+            job.finish("failed", {"error": "No syllabus or schedule found."})
+            return
+        if budget.complete:
+            result_key = etag
+        else:
+            # Partial result: keep it for this job only, never under the input ETag
+            result_key = f"job:{job.job_id}"
+        if not app.state.artifact_cache.put(result_key, *artifact):
+            if not app.state.jobs.hold(job, artifact):
+                job.finish("failed", {"error": "Result too large to keep; use /generar instead."})
+                return
+            result_key = f"job:{job.job_id}"
+        job.finish("done", {
+            "result_url": result_url, "media_type": artifact[1], "filename": artifact[2],
+            "etag": etag if result_key == etag else None,
+        }, result_key)
+    except HTTPException as e:
+        job.finish("failed", {"error": e.detail, "retry_after": (e.headers or {}).get("Retry-After")})
+    except Exception as e:
+        tb = traceback.format_exc()
+        print(f"[ERROR] Falló el job {job.job_id}: {e}\n{tb}")
+        job.finish("failed", {"error": str(e)})
+
+@router.post("/jobs/generar", status_code=202, dependencies=[Depends(rate_limit)])
+async def submit_generar_job(request: Request, files: List[UploadFile] = File(...), semester_start: str | None = Form(None)):
+    """Same input as /generar, but returns immediately with a job id.
+    Progress (stage transitions and per-file results) streams from /jobs/{id}/events;
+    the final PDF/ICS/ZIP is downloaded from /jobs/{id}/result.
+    """
+    etag = await uploads_etag("generar", files, semester_start=_schedule_anchor_param(semester_start))
+    # Uploads are closed when this request ends: copy them for the background task
+    buffered = []
+    for file in files:
+        buffered.append(UploadFile(io.BytesIO(await file.read()), filename=file.filename))
+    job = request.app.state.jobs.create(etag)
+    job.task = asyncio.create_task(_run_generar_job(request.app, job, buffered, semester_start, etag))
+    return {
+        "job_id": job.job_id,
+        "events_url": f"/jobs/{job.job_id}/events",
+        "result_url": f"/jobs/{job.job_id}/result",
+    }
+
+@router.get("/jobs/{job_id}/events")
+async def job_events(request: Request, job_id: str):
+    from fastapi.responses import StreamingResponse
+    job = request.app.state.jobs.get(job_id)
+    if job is None:
+        raise HTTPException(status_code=404, detail="Unknown job id.")
+    return StreamingResponse(job.stream(), media_type="text/event-stream", headers={
+        "Cache-Control": "no-cache",
+        "X-Accel-Buffering": "no",  # disable proxy buffering (nginx)
+    })
+
+@router.get("/jobs/{job_id}/result")
+async def job_result(request: Request, job_id: str):
+    job = request.app.state.jobs.get(job_id)
+    if job is None:
+        raise HTTPException(status_code=404, detail="Unknown job id.")
+    if not job.finished:
+        raise HTTPException(status_code=409, detail="Job still running.", headers={"Retry-After": "2"})
+    if job.result_key is None:
+        raise HTTPException(status_code=404, detail="Job produced no artifact.")
+    if job.result is not None:
+        # Not in the artifact cache: released after this download
+        item, job.result = job.result, None
+        return _artifact_response(*item, None)
+    item = request.app.state.artifact_cache.get(job.result_key)
+    if item is None:
+        raise HTTPException(status_code=410, detail="Job result expired; submit the job again.")
+    return _artifact_response(*item, job.etag if job.result_key == job.etag else None)
+
+@router.get("/artifacts/{artifact_id}", dependencies=[Depends(rate_limit)])
+async def get_artifact(request: Request, artifact_id: str):
+    """Previously rendered artifact by ETag. The URL is content-addressed (same uploads and
+    parameters -> same URL), so browsers may keep it; revalidation with If-None-Match gets 304."""
+    etag = f'"{artifact_id}"'
+    cache: ArtifactCache = request.app.state.artifact_cache
+    cache_control = f"private, max-age={ARTIFACT_MAX_AGE}, immutable"
+    item = cache.get(etag)
+    if item is None:
+        raise HTTPException(status_code=404, detail="Unknown or expired artifact; upload the files again.")
+    if _etag_matches(request, etag):
+        cache.not_modified += 1
+        return Response(status_code=304, headers={"ETag": etag, "Cache-Control": cache_control})
+    return _artifact_response(*item, etag, cache_control=cache_control)
+
+# ------------------------------
+# App factory / preload
+# ------------------------------
+def warm_up() -> None:
+    """Import heavy backends and load font metrics ahead of time.
+    Meant to run once in the master process before forking workers (gunicorn --preload),
+    so every worker shares these pages copy-on-write instead of loading its own copy.
+    """
+    _load_pdfplumber()
+    import pypdf  # noqa: F401
+    _backend_available(get_text_backend().name)
+    import ics  # noqa: F401
+    from reportlab.pdfbase import pdfmetrics
+    from reportlab.pdfgen import canvas  # noqa: F401
+    for font in ("Helvetica", "Helvetica-Bold"):
+        pdfmetrics.getFont(font)
+    # Move everything allocated so far to the permanent generation: the GC will not touch
+    # (and therefore not dirty) these objects in the forked workers.
+    gc.freeze()
+
+def create_app(preload: bool | None = None) -> FastAPI:
+    """Build the FastAPI application.
+    `preload` warms heavy backends up front (see warm_up); by default it follows the
+    SYLLABUS_PRELOAD env var and stays lazy, which keeps single-process startup fast.
+    """
+    if preload is None:
+        preload = os.getenv("SYLLABUS_PRELOAD", "").lower() in {"1", "true", "yes"}
+    if preload:
+        warm_up()
+    application = FastAPI()
+    application.state.admission = AdmissionController.from_env()
+    application.state.rate_limiter = TokenBucketLimiter.from_env()
+    application.state.artifact_cache = ArtifactCache.from_env()
+    application.state.jobs = JobRegistry.from_env()
+    application.state.syllabus_index = SyllabusIndex.from_env()
+    application.state.search_token = os.getenv("SYLLABUS_SEARCH_TOKEN") or None
+    application.state.memory = MemoryStats.from_env()
+    application.add_middleware(
+        CORSMiddleware,
+        allow_origins=ALLOWED_ORIGINS,
+        allow_credentials=True,
+        allow_methods=["*"],  # incluye OPTIONS
+        allow_headers=["*"],
+        expose_headers=["ETag", "Content-Disposition", "Content-Location"],
+    )
+    application.include_router(router)
+    return application
+
+app = create_app()
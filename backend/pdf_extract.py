@@ -0,0 +1,173 @@
+"""PDF text backends and the page-range workers of the process pool.
+
+Kept free of FastAPI and of main.py: spawned pool processes import only this module, so they
+neither build the app nor run the preload warm-up. main.py imports what it needs from here.
+"""
+import contextlib
+import functools
+import io
+import mmap
+import re
+import threading
+from typing import NamedTuple, Sequence
+
+@functools.cache
+def _load_pdfplumber():
+    """Import pdfplumber on first use; None when it is not installed."""
+    try:
+        import pdfplumber  # Optional, better table/positional extraction
+    except ImportError:  # pragma: no cover
+        return None
+    return pdfplumber
+
+def _strip_accents(s: str) -> str:
+    return (
+        s.replace('á', 'a').replace('é', 'e').replace('í', 'i').replace('ó', 'o').replace('ú', 'u')
+         .replace('Á', 'a').replace('É', 'e').replace('Í', 'i').replace('Ó', 'o').replace('Ú', 'u')
+    )
+
+class EvalItem(NamedTuple):
+    """One evaluation criterion, e.g. EvalItem('Examen final', 40)."""
+    label: str
+    pct: int
+
+    def __str__(self) -> str:
+        return f"{self.label}: {self.pct}%"
+
+# ------------------------------
+# PDF text backends
+# ------------------------------
+# Backends take either the PDF bytes or a path to the PDF on disk (used by the page-parallel
+# workers), plus optional 0-based page indices.
+@contextlib.contextmanager
+def _open_mmap(path: str):
+    with open(path, 'rb') as fh, mmap.mmap(fh.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+        yield mm
+
+class PypdfBackend:
+    """Default backend: pure-Python pypdf, always available."""
+    name = "pypdf"
+    # Hashing the pages for PAGE_CACHE costs ~5% of a pypdf extraction, so it pays off
+    cache_pages = True
+
+    def page_texts(self, pdf: bytes | str, pages: Sequence[int] | None = None) -> list[str]:
+        from pypdf import PdfReader
+        if isinstance(pdf, str):
+            with _open_mmap(pdf) as mm:
+                return self._texts(PdfReader(mm), pages)
+        return self._texts(PdfReader(io.BytesIO(pdf)), pages)
+
+    @staticmethod
+    def _texts(reader, pages: Sequence[int] | None) -> list[str]:
+        indices = pages if pages is not None else range(len(reader.pages))
+        return [reader.pages[i].extract_text() or '' for i in indices]
+
+class PdfiumBackend:
+    """PDFium through pypdfium2 (installed along with recent pdfplumber versions).
+    PDFium is not thread-safe, so parse threads of one process take turns (`_lock`);
+    page-parallel work goes through the process pool instead.
+    """
+    name = "pdfium"
+    # Hashing the pages (a pypdf parse) costs 0.5-1.2x a whole pdfium extraction: extract directly
+    cache_pages = False
+    _lock = threading.Lock()
+
+    def page_texts(self, pdf: bytes | str, pages: Sequence[int] | None = None) -> list[str]:
+        import pypdfium2 as pdfium
+        with self._lock:
+            doc = pdfium.PdfDocument(pdf)
+            try:
+                texts = []
+                for i in (pages if pages is not None else range(len(doc))):
+                    page = doc[i]
+                    textpage = page.get_textpage()
+                    texts.append(textpage.get_text_range().replace('\r\n', '\n'))
+                    textpage.close()
+                    page.close()
+                return texts
+            finally:
+                doc.close()
+
+class MupdfBackend:
+    """MuPDF through PyMuPDF (optional). Like PDFium, not thread-safe: one call at a time per process."""
+    name = "mupdf"
+    cache_pages = False
+    _lock = threading.Lock()
+
+    def page_texts(self, pdf: bytes | str, pages: Sequence[int] | None = None) -> list[str]:
+        try:
+            import pymupdf
+        except ImportError:  # PyMuPDF < 1.24 only ships the `fitz` name
+            import fitz as pymupdf
+        with self._lock:
+            opened = pymupdf.open(pdf) if isinstance(pdf, str) else pymupdf.open(stream=pdf, filetype="pdf")
+            with opened as doc:
+                return [doc[i].get_text() for i in (pages if pages is not None else range(len(doc)))]
+
+TEXT_BACKENDS = {backend.name: backend for backend in (PypdfBackend, PdfiumBackend, MupdfBackend)}
+
+# ------------------------------
+# Evaluation tables
+# ------------------------------
+def _eval_rows_from_table(tb) -> list[EvalItem]:
+    """Turn one extracted table into EvalItem rows.
+    A row qualifies when one cell is a numeric weight (40 or 40%) and the other cells form the label.
+    """
+    results: list[EvalItem] = []
+    # Skip too small tables
+    if not tb or len(tb) < 2:
+        return results
+    # Normalize table cells
+    norm = [[(c or '').strip() for c in row] for row in tb]
+    # Try to detect header row if contains 'ponderación'
+    header_idx = 0
+    for i in range(min(2, len(norm))):
+        header_line = ' '.join(norm[i]).lower()
+        if 'ponderacion' in _strip_accents(header_line) or '%' in header_line:
+            header_idx = i
+            break
+    rows = norm[header_idx+1:] if header_idx < len(norm) else norm
+    for row in rows:
+        if not row:
+            continue
+        # Find a numeric cell to use as percent
+        pct_val = None
+        label_parts: list[str] = []
+        for cell in row:
+            txt = (cell or '').strip()
+            if not txt:
+                continue
+            m_pct = re.fullmatch(r"(\d{1,3})\s*%?", _strip_accents(txt))
+            if m_pct:
+                try:
+                    v = int(m_pct.group(1))
+                    if 0 <= v <= 100:
+                        pct_val = v
+                        continue
+                except Exception:
+                    pass
+            # Non-numeric, part of label
+            label_parts.append(txt)
+        if pct_val is not None and label_parts:
+            label = ' '.join(label_parts)
+            # Collapse whitespace
+            label = re.sub(r"\s+", " ", label)
+            # Trim overly generic tails
+            label = label.strip(' -:\u2013\u2014')
+            results.append(EvalItem(label, pct_val))
+    return results
+
+# ------------------------------
+# Page-range workers (run in the spawned process pool)
+# ------------------------------
+def _page_texts_worker(path: str, start: int, stop: int, backend_name: str) -> list[str]:
+    return TEXT_BACKENDS[backend_name]().page_texts(path, range(start, stop))
+
+def _eval_table_rows_worker(path: str, start: int, stop: int) -> list[EvalItem]:
+    pdfplumber = _load_pdfplumber()
+    results: list[EvalItem] = []
+    with _open_mmap(path) as mm, pdfplumber.open(mm, pages=list(range(start + 1, stop + 1))) as pdf:
+        for page in pdf.pages:
+            for tb in page.extract_tables() or []:
+                results.extend(_eval_rows_from_table(tb))
+    return results